@@ -1,5 +1,5 @@
 import dash
-from dash import dcc, html, Input, Output, State, dash_table
+from dash import dcc, html, Input, Output, State, ClientsideFunction, dash_table
 from dash.dash_table.Format import Format, Scheme, Symbol
 from dash.dash_table import FormatTemplate
 import dash_bootstrap_components as dbc
@@ -7,50 +7,606 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import seaborn as sns
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import base64
 from io import BytesIO
 import os
+import re
 import datetime
+from urllib.parse import parse_qs, urlencode
+import hashlib
+import importlib.util
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, request
+from plotly.io.json import to_json_plotly
+
+from instrumentation import instrument, stage
+
+log = logging.getLogger(__name__)
 
 # ----------- FILE PATHS -----------
 ONET_DIR = "Project2_Digital_Skills_Pulse_Dash/data/db_29_1_text/"
 ITU_CSV = "Project2_Digital_Skills_Pulse_Dash/data/ITU_DH.csv"
 BLS_XLSX = "Project2_Digital_Skills_Pulse_Dash/data/oesm24nat/national_M2024_dl.xlsx"
+SNAPSHOT_DIR = os.environ.get("SKILLS_PULSE_SNAPSHOT_DIR", "Project2_Digital_Skills_Pulse_Dash/data/.snapshots")
+# Bump when the cleaning below changes, so existing snapshots are rebuilt.
+SNAPSHOT_VERSION = 6
+ONET_FILES = {
+    "onet_occ": "Occupation Data.txt",
+    "onet_tech": "Technology Skills.txt",
+    "onet_tools": "Tools Used.txt",
+    "onet_tasks": "Task Statements.txt",
+    "onet_alt_titles": "Alternate Titles.txt",
+    "onet_related": "Related Occupations.txt",
+    "onet_job_zones": "Job Zones.txt",
+    "job_zone_reference": "Job Zone Reference.txt",
+}
+ONET_DETAIL_TABLES = ("onet_tech", "onet_tools", "onet_tasks", "onet_alt_titles", "onet_related")
+BLS_SORT_KEYS = ("TOT_EMP", "A_MEDIAN")
+BLS_TOP_N_OPTIONS = (15, 50, 100)
+# OEWS O_GROUP values below the all-occupations total, coarsest first.
+BLS_LEVELS = {
+    "major": "Major Groups",
+    "minor": "Minor Groups",
+    "broad": "Broad Occupations",
+    "detailed": "Detailed Occupations",
+}
+# SOC code characters a group shares with everything under it (15-0000, 15-1200, 15-1250).
+BLS_GROUP_PREFIX = {"major": 2, "minor": 4, "broad": 6}
+DEFAULT_BLS_LEVEL = "major"
+OCCUPATION_PATH = "/onet-occupation"
+DIGITAL_DEMAND_PATH = "/digital-demand"
+OVERVIEW_ROUTE = "/api/overview.json"
+ITU_MAP_ROUTE = "/api/itu-map.json"
+CROSSWALK_METRICS = {
+    "WEIGHTED_HOT_DEMAND": "Employment-weighted Hot Technologies",
+    "HOT_TECHNOLOGIES": "Hot Technologies per Occupation",
+    "HOT_SHARE": "Hot Technology Share",
+    "DIGITAL_SKILLS": "Digital Skills per Occupation",
+    "TOT_EMP": "Total Employed",
+    "A_MEDIAN": "Median Salary ($)",
+}
+DEFAULT_OCCUPATION = "15-1252.00"  # Software Developers
+# pyarrow backs the Parquet snapshots and the multithreaded CSV reader.
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+CSV_ENGINE = "pyarrow" if HAVE_PYARROW else "c"
 
 # ----------- LOAD DATA & CLEANING -----------
 
-# O*NET Data
-onet_occ = pd.read_csv(ONET_DIR + "Occupation Data.txt", sep="\t", low_memory=False)
-onet_tech = pd.read_csv(ONET_DIR + "Technology Skills.txt", sep="\t", low_memory=False)
-onet_occ.columns = [c.strip() for c in onet_occ.columns]
-onet_tech.columns = [c.strip() for c in onet_tech.columns]
-
-onet_digital = onet_tech[onet_tech['Commodity Title'].str.contains("Computer|Software|Python|AI", na=False, case=False)]
-top_onet_digital = onet_digital['O*NET-SOC Code'].value_counts().head(10)
-top_onet_jobs = onet_occ[onet_occ['O*NET-SOC Code'].isin(top_onet_digital.index)]
-
-# World Bank/ITU
-itu = pd.read_csv(ITU_CSV)
-itu.columns = [c.strip().upper() for c in itu.columns]
-if 'REF_AREA_LABEL' in itu.columns and 'TIME_PERIOD' in itu.columns:
-    latest_itu = itu.sort_values(['REF_AREA_LABEL', 'TIME_PERIOD']).drop_duplicates(['REF_AREA_LABEL'], keep='last')
-else:
-    raise Exception("Missing columns in ITU data: check that 'REF_AREA_LABEL' and 'TIME_PERIOD' exist.")
-if 'OBS_VALUE' in itu.columns:
-    latest_itu['OBS_VALUE'] = pd.to_numeric(latest_itu['OBS_VALUE'], errors='coerce')
-else:
-    raise Exception("Missing 'OBS_VALUE' column in ITU data.")
-
-# BLS Data
-bls = pd.read_excel(BLS_XLSX)
-bls.columns = [c.strip().upper() for c in bls.columns]
-for col in ["A_MEDIAN", "TOT_EMP"]:
-    bls[col] = pd.to_numeric(bls[col], errors="coerce")
-bls = bls.dropna(subset=["A_MEDIAN", "TOT_EMP"])
-bls = bls[bls["A_MEDIAN"] > 0]
-bls = bls[bls["TOT_EMP"] > 0]
-grouped_bls = bls.groupby('OCC_TITLE').agg({'TOT_EMP': 'sum', 'A_MEDIAN': 'median'}).reset_index()
+def read_onet(file_name, engine=None):
+    engine = engine or CSV_ENGINE
+    options = {} if engine == "pyarrow" else {"low_memory": False}
+    df = pd.read_csv(ONET_DIR + file_name, sep="\t", engine=engine, **options)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+def load_onet(engine=None, workers=4):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        tables = dict(zip(ONET_FILES, pool.map(lambda f: read_onet(f, engine), ONET_FILES.values())))
+    onet_occ = tables["onet_occ"].sort_values("O*NET-SOC Code").reset_index(drop=True)
+    codes = pd.Index(onet_occ["O*NET-SOC Code"])
+    # Joins go through an integer occupation id (row of onet_occ) instead of
+    # SOC code strings; detail tables are sorted by it (see OnetStore).
+    for name in ONET_DETAIL_TABLES:
+        df = tables[name]
+        df.insert(0, "occ_id", codes.get_indexer(df["O*NET-SOC Code"]))
+        if name == "onet_related":
+            df["related_id"] = codes.get_indexer(df["Related O*NET-SOC Code"])
+            df = df[df["related_id"] >= 0]
+        tables[name] = df[df["occ_id"] >= 0].sort_values("occ_id", kind="stable").reset_index(drop=True)
+    zones = tables.pop("onet_job_zones").drop_duplicates("O*NET-SOC Code", keep="last")
+    onet_occ["Job Zone"] = zones.set_index("O*NET-SOC Code")["Job Zone"].reindex(codes).astype("Int8").reset_index(drop=True)
+    tables["onet_occ"] = onet_occ
+    return tables
+
+
+# ITU country labels (World Bank spelling, plus common variants) -> ISO 3166-1
+# alpha-3. The file's REF_AREA codes are not reliably ISO-3 (GER, JAP, UNI, ...),
+# so the map is placed from the country name; unlisted names stay on plotly's
+# own name matching.
+COUNTRY_ISO3 = {
+    "Argentina": "ARG", "Australia": "AUS", "Austria": "AUT", "Bangladesh": "BGD",
+    "Belgium": "BEL", "Bolivia": "BOL", "Brazil": "BRA", "Bulgaria": "BGR",
+    "Canada": "CAN", "Chile": "CHL", "China": "CHN", "Colombia": "COL",
+    "Costa Rica": "CRI", "Cote d'Ivoire": "CIV", "Côte d'Ivoire": "CIV", "Croatia": "HRV",
+    "Cyprus": "CYP", "Czechia": "CZE", "Czech Republic": "CZE", "Denmark": "DNK",
+    "Ecuador": "ECU", "Egypt": "EGY", "Egypt, Arab Rep.": "EGY", "Estonia": "EST",
+    "Ethiopia": "ETH", "Finland": "FIN", "France": "FRA", "Germany": "DEU",
+    "Ghana": "GHA", "Greece": "GRC", "Hong Kong SAR, China": "HKG", "Hungary": "HUN",
+    "Iceland": "ISL", "India": "IND", "Indonesia": "IDN", "Iran, Islamic Rep.": "IRN",
+    "Ireland": "IRL", "Israel": "ISR", "Italy": "ITA", "Japan": "JPN",
+    "Kazakhstan": "KAZ", "Kenya": "KEN", "Korea, Rep.": "KOR", "Latvia": "LVA",
+    "Lithuania": "LTU", "Luxembourg": "LUX", "Malaysia": "MYS", "Malta": "MLT",
+    "Mexico": "MEX", "Morocco": "MAR", "Netherlands": "NLD", "New Zealand": "NZL",
+    "Nigeria": "NGA", "Norway": "NOR", "Pakistan": "PAK", "Peru": "PER",
+    "Philippines": "PHL", "Poland": "POL", "Portugal": "PRT", "Romania": "ROU",
+    "Russian Federation": "RUS", "Saudi Arabia": "SAU", "Serbia": "SRB", "Singapore": "SGP",
+    "Slovak Republic": "SVK", "Slovenia": "SVN", "South Africa": "ZAF", "Spain": "ESP",
+    "Sweden": "SWE", "Switzerland": "CHE", "Thailand": "THA", "Tunisia": "TUN",
+    "Turkey": "TUR", "Türkiye": "TUR", "Turkiye": "TUR", "Ukraine": "UKR",
+    "United Arab Emirates": "ARE", "United Kingdom": "GBR", "United States": "USA",
+    "Uruguay": "URY", "Viet Nam": "VNM", "Vietnam": "VNM",
+}
+
+
+def load_itu():
+    itu = pd.read_csv(ITU_CSV)
+    itu.columns = [c.strip().upper() for c in itu.columns]
+    if 'REF_AREA_LABEL' in itu.columns and 'TIME_PERIOD' in itu.columns:
+        latest_itu = itu.sort_values(['REF_AREA_LABEL', 'TIME_PERIOD']).drop_duplicates(['REF_AREA_LABEL'], keep='last')
+    else:
+        raise Exception("Missing columns in ITU data: check that 'REF_AREA_LABEL' and 'TIME_PERIOD' exist.")
+    if 'OBS_VALUE' in itu.columns:
+        latest_itu['OBS_VALUE'] = pd.to_numeric(latest_itu['OBS_VALUE'], errors='coerce')
+    else:
+        raise Exception("Missing 'OBS_VALUE' column in ITU data.")
+    latest_itu['ISO3'] = latest_itu['REF_AREA_LABEL'].astype(str).str.strip().map(COUNTRY_ISO3)
+    return {"latest_itu": latest_itu}
+
+
+def itu_choropleth(latest_itu, **kwargs):
+    """Choropleth placed by ISO-3 code, with unmapped countries matched by name on a shared color axis."""
+    mapped = latest_itu["ISO3"].notna()
+    fig = px.choropleth(
+        latest_itu[mapped], locations="ISO3", locationmode="ISO-3",
+        hover_name="REF_AREA_LABEL", color="OBS_VALUE", **kwargs
+    )
+    if not mapped.all():
+        fig.add_traces(px.choropleth(
+            latest_itu[~mapped], locations="REF_AREA_LABEL", locationmode="country names",
+            color="OBS_VALUE", **kwargs
+        ).data)
+    return fig
+
+
+def rank_itu(tables):
+    """Countries in descending indicator order, so the top-N table is a slice."""
+    latest_itu = tables["latest_itu"]
+    return {"itu_ranking": np.argsort(-latest_itu["OBS_VALUE"].to_numpy(), kind="stable")}
+
+
+def load_bls():
+    bls = pd.read_excel(BLS_XLSX)
+    bls.columns = [c.strip().upper() for c in bls.columns]
+    # Wage columns mix numbers with BLS footnote markers ('*' not available,
+    # '#' above the top wage bracket); coerce them all like A_MEDIAN.  Only
+    # named columns: text columns (OCC_CODE, O_GROUP, ...) must stay text.
+    wage_columns = [c for c in bls.columns if re.fullmatch(r"[HA]_(MEAN|MEDIAN|PCT\d+)", c)]
+    for col in ["TOT_EMP"] + wage_columns:
+        bls[col] = pd.to_numeric(bls[col], errors="coerce")
+    bls = bls.dropna(subset=["A_MEDIAN", "TOT_EMP"])
+    bls = bls[bls["A_MEDIAN"] > 0]
+    bls = bls[bls["TOT_EMP"] > 0]
+    return {"bls": bls}
+
+
+# ----------- PARSED-DATA SNAPSHOTS -----------
+# Cleaned tables are saved as Parquet next to a manifest of their source
+# files' size, mtime and SHA-256, so restarts and extra workers skip the slow
+# XLSX/TSV parsing.  A source whose mtime changed but whose hash did not (a
+# fresh checkout, a touch) keeps its snapshot.  Needs pyarrow; without it, or
+# with SKILLS_PULSE_SNAPSHOT_DIR set empty, the sources are parsed on every start.
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_entry(path, sha256=None):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256 or _sha256(path)}
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_manifest(path, manifest):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(path, write)
+
+
+def _snapshot_sources(manifest, sources):
+    """Fresh manifest source entries if `sources` are unchanged since the snapshot, else None."""
+    if not manifest or manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    entries = {}
+    for path in sources:
+        old = manifest["sources"].get(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not old or old["size"] != st.st_size:
+            return None
+        if old["mtime_ns"] == st.st_mtime_ns:
+            entries[path] = old
+        elif old["sha256"] == _sha256(path):
+            entries[path] = dict(old, mtime_ns=st.st_mtime_ns)
+        else:
+            return None
+    return entries
+
+
+def load_snapshot(name, sources, build):
+    """Tables from build(), served from the `name` snapshot while `sources` are unchanged."""
+    if not HAVE_PYARROW or not SNAPSHOT_DIR:
+        return build()
+    folder = os.path.join(SNAPSHOT_DIR, name)
+    manifest_path = os.path.join(folder, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+
+    entries = _snapshot_sources(manifest, sources)
+    if entries is not None:
+        try:
+            tables = {t: pd.read_parquet(os.path.join(folder, f"{t}.parquet")) for t in manifest["tables"]}
+        except (OSError, ValueError):
+            tables = None
+        if tables is not None:
+            if entries != manifest["sources"]:
+                manifest["sources"] = entries
+                _write_manifest(manifest_path, manifest)
+            return tables
+
+    # Hash before parsing, so a source edited mid-build is caught next start.
+    entries = {path: _source_entry(path) for path in sources}
+    tables = build()
+    try:
+        os.makedirs(folder, exist_ok=True)
+        for t, df in tables.items():
+            _write_atomic(os.path.join(folder, f"{t}.parquet"), df.to_parquet)
+        manifest = {"version": SNAPSHOT_VERSION, "sources": entries, "tables": list(tables)}
+        _write_manifest(manifest_path, manifest)
+    except OSError:
+        pass  # read-only checkout: run without a snapshot
+    return tables
+
+
+# ----------- O*NET SKILL KEYWORD INDEX -----------
+TOKEN_PATTERN = r"[a-z0-9][a-z0-9+#]*"  # keeps "c++", "c#"; splits "node.js" into two tokens
+DEFAULT_ONET_QUERY = "computer* OR software* OR python OR ai"
+
+
+class SkillIndex:
+    """Inverted index from lower-cased tokens to the sorted row ids containing them.
+
+    Posting lists are stored back to back (CSR) in vocabulary order, so the
+    rows of every token sharing a prefix form one contiguous slice.  Queries:
+    terms are AND-ed, "OR" separates alternatives and a trailing * matches a
+    prefix, e.g. "python OR data analy*".
+    """
+
+    def __init__(self, texts):
+        texts = texts.reset_index(drop=True)
+        tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        self.n_rows = len(texts)
+        self.vocab, token_ids = np.unique(tokens.to_numpy(dtype=str), return_inverse=True)
+        # One entry per (token, row), ordered by token then row.
+        pairs = np.unique(token_ids.astype(np.int64) * self.n_rows + tokens.index.to_numpy())
+        token_ids, rows = np.divmod(pairs, self.n_rows)
+        self.postings = rows.astype(np.int32)
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=len(self.vocab)), out=self.offsets[1:])
+
+    def _term_rows(self, term):
+        if term.endswith("*"):
+            prefix = term[:-1]
+            lo = np.searchsorted(self.vocab, prefix)
+            hi = np.searchsorted(self.vocab, prefix + "\U0010ffff")
+            return np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+        i = np.searchsorted(self.vocab, term)
+        if i < len(self.vocab) and self.vocab[i] == term:
+            return self.postings[self.offsets[i]:self.offsets[i + 1]]
+        return self.postings[:0]
+
+    def search(self, query):
+        """Sorted row ids matching `query`."""
+        matches = []
+        for alternative in re.split(r"\s+OR\s+|\|", query or ""):
+            terms = re.findall(TOKEN_PATTERN + r"\*?", re.sub(r"\bAND\b", " ", alternative).lower())
+            if not terms:
+                continue
+            # Intersect the shortest posting lists first.
+            postings = sorted((self._term_rows(t) for t in terms), key=len)
+            rows = postings[0]
+            for other in postings[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+            matches.append(rows)
+        if not matches:
+            return self.postings[:0]
+        return np.unique(np.concatenate(matches))
+
+
+# ----------- LAZY DATASETS -----------
+# Each data domain loads on first use (page render or callback), so a user
+# opening /onet never waits for the BLS workbook, and a missing or broken
+# source only takes down its own page.  warm_datasets() preloads them all in
+# the background once the server is up.
+
+class DatasetUnavailable(Exception):
+    def __init__(self, name, error):
+        super().__init__(f"{name.upper()} data is unavailable: {error}")
+        self.name = name
+        self.error = error
+
+
+class Dataset:
+    """One data domain's tables, loaded once on first access (thread-safe).
+
+    `sources` are the files behind the snapshot; None marks a dataset derived
+    from other datasets, which is rebuilt rather than snapshotted.
+    """
+
+    RETRY_SECONDS = 60  # failed loads are retried after this, e.g. once a missing file is added
+
+    def __init__(self, name, sources, build, prepare=None):
+        self.name = name
+        self.sources = sources
+        self.build = build
+        self.prepare = prepare
+        self._lock = threading.Lock()
+        self._tables = None
+        self._error = None
+        self._failed_at = 0.0
+        self.load_seconds = None
+
+    def _stale_failure(self):
+        return self._error is not None and time.monotonic() - self._failed_at > self.RETRY_SECONDS
+
+    def get(self):
+        if self._tables is None and (self._error is None or self._stale_failure()):
+            with self._lock:
+                if self._tables is None and (self._error is None or self._stale_failure()):
+                    t0 = time.perf_counter()
+                    try:
+                        if self.sources is None:  # derived from other datasets
+                            tables = self.build()
+                        else:
+                            tables = load_snapshot(self.name, self.sources, self.build)
+                        if self.prepare:
+                            tables.update(self.prepare(tables))
+                        self._tables, self._error = tables, None
+                    except Exception as e:
+                        self._error, self._failed_at = e, time.monotonic()
+                    self.load_seconds = time.perf_counter() - t0
+                    if self._error is None:
+                        log.info("%s data loaded in %.2fs", self.name, self.load_seconds)
+                    else:
+                        log.warning("%s data failed to load in %.2fs: %s", self.name, self.load_seconds, self._error)
+        if self._tables is None:
+            raise DatasetUnavailable(self.name, self._error)
+        return self._tables
+
+    def __getitem__(self, table):
+        return self.get()[table]
+
+    def available(self):
+        try:
+            self.get()
+        except DatasetUnavailable:
+            return False
+        return True
+
+
+class OnetStore:
+    """O*NET occupation tables joined on integer occupation ids.
+
+    occ_id is the row of `occupations`.  Each detail table is sorted by
+    occ_id and has CSR offsets, so all of an occupation's rows are one slice,
+    and related occupations are stored as ids: a drill-down is a handful of
+    slices and positional lookups, with no merge.
+    """
+
+    def __init__(self, tables):
+        self.occupations = tables["onet_occ"]
+        self.job_zones = tables["job_zone_reference"].set_index("Job Zone")
+        self.codes = pd.Index(self.occupations["O*NET-SOC Code"])
+        self.tables = {name: tables[name] for name in ONET_DETAIL_TABLES}
+        bounds = np.arange(len(self.occupations) + 1)
+        self.offsets = {name: np.searchsorted(df["occ_id"].to_numpy(), bounds) for name, df in self.tables.items()}
+
+    def occ_id(self, code):
+        """Occupation id for an O*NET-SOC code, or None."""
+        i = self.codes.get_indexer([code])[0]
+        return None if i < 0 else int(i)
+
+    def rows(self, table, occ_id):
+        offsets = self.offsets[table]
+        return self.tables[table].iloc[offsets[occ_id]:offsets[occ_id + 1]]
+
+    def related(self, occ_id):
+        related = self.rows("onet_related", occ_id)
+        return self.occupations.iloc[related["related_id"].to_numpy()].assign(
+            Tier=related["Relatedness Tier"].to_numpy())
+
+
+def prepare_onet(tables):
+    """Join indices over the O*NET tables and the Technology Skills keyword index."""
+    onet_occ, onet_tech = tables["onet_occ"], tables["onet_tech"]
+    prepared = {
+        "onet_store": OnetStore(tables),
+        "skill_index": SkillIndex(onet_tech['Commodity Title'].fillna('') + " " + onet_tech['Example'].fillna('')),
+        "skill_occ_codes": onet_tech["occ_id"].to_numpy(),
+        "skill_occupations": onet_occ[["Title", "O*NET-SOC Code"]],
+    }
+    top_codes = match_occupations(dict(tables, **prepared), DEFAULT_ONET_QUERY, 10)['O*NET-SOC Code']
+    prepared["top_onet_jobs"] = onet_occ[onet_occ['O*NET-SOC Code'].isin(top_codes)]
+    return prepared
+
+
+def match_occupations(tables, query, top_n):
+    """Occupations ranked by their Technology Skills rows matching `query` (Title, code, Count)."""
+    rows = tables["skill_index"].search(query)
+    occupations = tables["skill_occupations"]
+    counts = np.bincount(tables["skill_occ_codes"][rows], minlength=len(occupations))
+    order = np.argsort(-counts, kind="stable")[:top_n]
+    order = order[counts[order] > 0]
+    return occupations.iloc[order].assign(Count=counts[order]).reset_index(drop=True)
+
+
+class OccupationHierarchy:
+    """OEWS occupations split by SOC level, ranked within every group above them.
+
+    OEWS publishes each major, minor and broad group as a row of its own with
+    the group's employment and median wage (medians do not roll up from the
+    children), so the rollups are those rows, keyed by O_GROUP.  A row's
+    ancestor at a coarser level is the group row sharing its SOC code prefix
+    (BLS_GROUP_PREFIX); rows whose group was dropped for suppressed wages are
+    left out of that group's drill-down rather than attached to a sibling.
+    The row order for every (level, group, sort key) is computed here once;
+    a drill-down is a slice.
+    """
+
+    def __init__(self, bls):
+        depth = bls["O_GROUP"].map({"total": 0, **{level: i + 1 for i, level in enumerate(BLS_LEVELS)}})
+        bls, depth = bls[depth.notna()], depth.dropna().astype(int).to_numpy()
+        order = np.lexsort((depth, bls["OCC_CODE"].to_numpy()))
+        rows, depth = bls.iloc[order].reset_index(drop=True), depth[order]
+        codes = rows["OCC_CODE"].to_numpy()
+        ancestors = {}
+        for d, level in enumerate(list(BLS_LEVELS)[:-1], start=1):
+            prefixes = rows["OCC_CODE"].str[:BLS_GROUP_PREFIX[level]]
+            groups = pd.Series(codes[depth == d], index=prefixes[depth == d])
+            ancestor = prefixes.map(groups).to_numpy()
+            ancestors[level] = np.where((depth > d) & pd.notna(ancestor), ancestor, None)
+
+        total = rows.loc[depth == 0, "TOT_EMP"]
+        self.total_employment = total.iloc[0] if len(total) else rows.loc[depth == 1, "TOT_EMP"].sum()
+        self.titles = dict(zip(codes[depth < len(BLS_LEVELS)], rows["OCC_TITLE"].to_numpy()[depth < len(BLS_LEVELS)]))
+        self.levels, self.groups, self._rankings = {}, {}, {}
+        for d, level in enumerate(BLS_LEVELS, start=1):
+            at_level = depth == d
+            frame = rows.loc[at_level, ["OCC_CODE", "OCC_TITLE", "TOT_EMP", "A_MEDIAN"]].reset_index(drop=True)
+            self.levels[level] = frame
+            for key in BLS_SORT_KEYS:
+                ranking = np.argsort(-frame[key].to_numpy(), kind="stable")
+                self._rankings[level, None, key] = ranking
+                for above in list(BLS_LEVELS)[:d - 1]:
+                    groups = pd.Series(ancestors[above][at_level][ranking])
+                    for code, idx in groups.groupby(groups).indices.items():
+                        self._rankings[level, code, key] = ranking[idx]
+            self.groups[level] = sorted(code for lvl, code, key in self._rankings
+                                        if lvl == level and code is not None and key == BLS_SORT_KEYS[0])
+
+    def has(self, level, within=None):
+        return (level, within, BLS_SORT_KEYS[0]) in self._rankings
+
+    def top(self, level, sort_by, top_n, within=None):
+        """The top_n rows of a level (inside group `within`, if given) by sort_by, descending."""
+        ranking = self._rankings.get((level, within, sort_by), [])
+        return self.levels[level].iloc[ranking[:top_n]]
+
+
+def prepare_bls(tables):
+    """OEWS occupation hierarchy with its precomputed rankings."""
+    return {"bls_hierarchy": OccupationHierarchy(tables["bls"])}
+
+
+def top_bls(sort_by, top_n, level=DEFAULT_BLS_LEVEL, within=None):
+    """The top_n occupations of a hierarchy level by sort_by, descending."""
+    return bls_data["bls_hierarchy"].top(level, sort_by, top_n, within)
+
+
+def build_crosswalk():
+    """Detailed BLS occupations joined to O*NET technology metrics on SOC code.
+
+    O*NET codes are SOC codes plus a suffix (15-1252.00 -> 15-1252); metrics
+    are averages over the O*NET occupations under one SOC code.  OEWS codes
+    ending in 0 that have no exact match (13-1020) aggregate several SOC
+    codes and are matched on their 6-character prefix.  Indexed by OCC_CODE,
+    with a descending row order per metric.
+    """
+    detailed, onet = bls_data["bls_hierarchy"].levels["detailed"], onet_data.get()
+    onet_occ, onet_tech = onet["onet_occ"], onet["onet_tech"]
+    n_occ = len(onet_occ)
+    occ_ids = onet_tech["occ_id"].to_numpy()
+    per_occ = pd.DataFrame({
+        "TECH_SKILLS": np.bincount(occ_ids, minlength=n_occ),
+        "DIGITAL_SKILLS": np.bincount(occ_ids[onet["skill_index"].search(DEFAULT_ONET_QUERY)], minlength=n_occ),
+        "HOT_TECHNOLOGIES": np.bincount(occ_ids, weights=onet_tech["Hot Technology"].eq("Y").to_numpy(), minlength=n_occ),
+    })
+
+    def per_code(keys):
+        grouped = per_occ.groupby(keys.to_numpy())
+        return grouped.mean().assign(ONET_OCCUPATIONS=grouped.size())
+
+    codes = onet_occ["O*NET-SOC Code"]
+    exact = per_code(codes.str[:7]).reindex(detailed["OCC_CODE"])
+    by_prefix = per_code(codes.str[:6]).reindex(detailed["OCC_CODE"].str[:6])
+    use_prefix = exact["ONET_OCCUPATIONS"].isna().to_numpy() & detailed["OCC_CODE"].str.endswith("0").to_numpy()
+    metrics = np.where(use_prefix[:, None], by_prefix.to_numpy(), exact.to_numpy())
+    crosswalk = detailed.assign(**dict(zip(exact.columns, metrics.T))).dropna(subset=["ONET_OCCUPATIONS"])
+    crosswalk = crosswalk.assign(
+        HOT_SHARE=crosswalk["HOT_TECHNOLOGIES"] / crosswalk["TECH_SKILLS"].where(crosswalk["TECH_SKILLS"] > 0),
+        WEIGHTED_HOT_DEMAND=crosswalk["TOT_EMP"] * crosswalk["HOT_TECHNOLOGIES"],
+    ).fillna({"HOT_SHARE": 0.0}).set_index("OCC_CODE", drop=False)
+    rankings = {m: np.argsort(-crosswalk[m].to_numpy(), kind="stable") for m in CROSSWALK_METRICS}
+    return {"crosswalk": crosswalk, "crosswalk_rankings": rankings}
+
+
+def top_crosswalk(metric, top_n):
+    """The top_n detailed occupations by a crosswalk metric, descending."""
+    tables = crosswalk_data.get()
+    return tables["crosswalk"].iloc[tables["crosswalk_rankings"][metric][:top_n]]
+
+
+bls_data = Dataset("bls", [BLS_XLSX], load_bls, prepare=prepare_bls)
+itu_data = Dataset("itu", [ITU_CSV], load_itu, prepare=rank_itu)
+onet_data = Dataset("onet", [ONET_DIR + f for f in ONET_FILES.values()], load_onet, prepare=prepare_onet)
+crosswalk_data = Dataset("crosswalk", None, build_crosswalk)
+DATASETS = {d.name: d for d in (bls_data, itu_data, onet_data, crosswalk_data)}
+
+_warm_lock = threading.Lock()
+_warm_started = False
+
+
+def load_datasets(datasets=None):
+    """Load datasets concurrently; returns {name: seconds} for each one.
+
+    The sources are independent and mostly I/O or pyarrow-bound, so a thread
+    per domain brings cold start close to the slowest single source (the
+    BLS workbook) instead of the sum of all of them.
+    """
+    datasets = list(datasets or DATASETS.values())
+    with ThreadPoolExecutor(max_workers=len(datasets)) as pool:
+        list(pool.map(Dataset.available, datasets))
+    return {d.name: d.load_seconds for d in datasets}
+
+
+def warm_datasets():
+    """Load every dataset in a background thread (once per process)."""
+    global _warm_started
+    with _warm_lock:
+        if _warm_started:
+            return
+        _warm_started = True
+    threading.Thread(target=_warm, name="warm-datasets", daemon=True).start()
+
+
+def _warm():
+    load_datasets()
+    overview_payload()
+    itu_map_payload()
+    prewarm_boxplots()
 
 # ----------- DASH APP INIT -----------
 app = dash.Dash(
@@ -60,6 +616,9 @@ app = dash.Dash(
 )
 
 app.title = "Digital Skills Pulse: Global Workforce Visualizer"
+instrument(app, "skills_pulse")
+# Under gunicorn et al. there is no __main__: warm up on the first request instead.
+app.server.before_request(warm_datasets)
 
 # Sort options for BLS
 # ---- Sorting options for dropdown ----
@@ -72,28 +631,107 @@ sort_options = [
 # --- BLS Markdown explainer ---
 bls_explainer = dcc.Markdown("""
 **About US Occupational Data (BLS):**
-- Data reflects major US occupation groups and their national employment and median annual salary (BLS OEWS 2024).
+- Data reflects US occupations and their national employment and median annual salary (BLS OEWS 2024).
+- Occupations follow the SOC hierarchy: major groups split into minor groups, broad occupations and detailed occupations. Pick a level, and optionally a group to drill into.
 - _"Total Employed"_ is the estimated number of jobs in the occupation group.
 - _"Median Salary"_ is the annual median wage for that group.
-- Only the top 15 groups by size are shown.
+- The top 15 groups are shown by default; pick up to the top 100 below.
 """, style={"marginBottom": "1rem"})
 
+# ----------- SALARY BOXPLOT -----------
+# "image": the seaborn PNG, drawn with matplotlib's object-oriented Agg API
+#          (no pyplot global state, so safe in threaded servers), cached per
+#          (level, group, sort key, rows shown) in a small LRU, and
+#          pre-rendered for each whole level by the warm-up thread.
+# "plotly": a native, interactive Plotly box trace built per request.
+# Pick with SKILLS_PULSE_BOXPLOT; benchmarks/boxplot_modes.py times both.
+BOXPLOT_MODES = ("image", "plotly")
+BOXPLOT_MODE = os.environ.get("SKILLS_PULSE_BOXPLOT", "image")
+# Each PNG is 0.1-0.6 MB; the pre-rendered whole-level views take up to 24.
+BOXPLOT_CACHE_SIZE = 48
+if BOXPLOT_MODE not in BOXPLOT_MODES:
+    raise ValueError(f"SKILLS_PULSE_BOXPLOT must be one of {BOXPLOT_MODES}, not {BOXPLOT_MODE!r}")
+
+
 def boxplot_img(sorted_bls):
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig = Figure(figsize=(14, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     sns.boxplot(data=sorted_bls, y="OCC_TITLE", x="A_MEDIAN", ax=ax, color='#2563eb')
     ax.set_title("Salary Distribution by Occupation Group", fontsize=18, pad=18)
     ax.set_xlabel("Median Salary ($)", fontsize=15)
     ax.set_ylabel("")
     ax.tick_params(axis="y", labelsize=13)
     ax.tick_params(axis="x", labelsize=13)
-    plt.tight_layout()
+    fig.tight_layout()
     buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    img_b64 = base64.b64encode(buf.read()).decode('utf-8')
+    fig.savefig(buf, format="png", bbox_inches='tight')
+    img_b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
     return "data:image/png;base64," + img_b64
 
+
+_boxplot_cache = OrderedDict()
+_boxplot_cache_lock = threading.Lock()
+_boxplot_render_lock = threading.Lock()
+
+
+def _cached_boxplot(key):
+    with _boxplot_cache_lock:
+        src = _boxplot_cache.get(key)
+        if src is not None:
+            _boxplot_cache.move_to_end(key)
+        return src
+
+
+def cached_boxplot_img(sort_by, top_n, level=DEFAULT_BLS_LEVEL, within=None):
+    sorted_bls = top_bls(sort_by, top_n, level, within)
+    # Keyed by the rows shown: a group smaller than N draws the same image for every larger N.
+    key = (level, within, sort_by, len(sorted_bls))
+    src = _cached_boxplot(key)
+    if src is None:
+        # One render at a time; concurrent misses for a key wait for the first.
+        with _boxplot_render_lock:
+            src = _cached_boxplot(key)
+            if src is None:
+                src = boxplot_img(sorted_bls)
+                if top_n not in BLS_TOP_N_OPTIONS or not bls_data["bls_hierarchy"].has(level, within):
+                    return src  # only dropdown values are cached
+                with _boxplot_cache_lock:
+                    _boxplot_cache[key] = src
+                    while len(_boxplot_cache) > BOXPLOT_CACHE_SIZE:
+                        _boxplot_cache.popitem(last=False)
+    return src
+
+
+def prewarm_boxplots():
+    """Render the boxplot for every level, sort key and N into the cache (default level first)."""
+    if BOXPLOT_MODE != "image" or not bls_data.available():
+        return
+    for level in sorted(BLS_LEVELS, key=lambda level: level != DEFAULT_BLS_LEVEL):
+        for sort_by in BLS_SORT_KEYS:
+            for top_n in BLS_TOP_N_OPTIONS:
+                cached_boxplot_img(sort_by, top_n, level)
+
+
+def boxplot_figure(sorted_bls):
+    fig = px.box(
+        sorted_bls, y="OCC_TITLE", x="A_MEDIAN",
+        labels={"OCC_TITLE": "", "A_MEDIAN": "Median Salary ($)"},
+        title="Salary Distribution by Occupation Group",
+        color_discrete_sequence=['#2563eb'], template="seaborn"
+    )
+    fig.update_layout(height=max(480, 26 * len(sorted_bls)))
+    return fig
+
+
+def boxplot_component(sort_by, top_n, sorted_bls, level=DEFAULT_BLS_LEVEL, within=None):
+    if BOXPLOT_MODE == "plotly":
+        return dcc.Graph(figure=boxplot_figure(sorted_bls), style={"marginBottom": "1.5rem"})
+    return html.Img(src=cached_boxplot_img(sort_by, top_n, level, within), style={
+        "width": "99%", "maxWidth": "1200px", "marginBottom": "1.5rem", "borderRadius": "10px",
+        "boxShadow": "0 2px 12px rgba(0,0,0,0.12)"
+    })
+
 SIDEBAR_STYLE = {
     "position": "fixed", "top": 0, "left": 0, "bottom": 0,
     "width": "19rem", "padding": "2rem 1rem", "backgroundColor": "#0a2540", "color": "#f8fafc", "zIndex": 100,
@@ -109,49 +747,157 @@ sidebar = html.Div([
         dbc.NavLink("US Jobs (BLS)", href="/us-jobs", active="exact", id="nav-bls"),
         dbc.NavLink("World Digital Skills", href="/global-skills", active="exact", id="nav-itu"),
         dbc.NavLink("O*NET Tech Skills", href="/onet", active="exact", id="nav-onet"),
+        dbc.NavLink("Occupation Explorer", href=OCCUPATION_PATH, active="exact", id="nav-occupation"),
+        dbc.NavLink("Digital Demand", href=DIGITAL_DEMAND_PATH, active="exact", id="nav-demand"),
     ], vertical=True, pills=True),
     html.Hr(),
 ], style=SIDEBAR_STYLE, id="sidebar")
 
+def unavailable_alert(error):
+    return dbc.Alert(str(error), color="warning", className="mb-4")
+
+
+# ----------- CACHED FIGURE JSON -----------
+# Figures that do not depend on user input (the overview, the ITU map) are
+# built once per loaded dataset and served as JSON with an ETag.  Pages fetch
+# them from the browser (assets/skills_pulse.js), so a repeat visit costs a
+# 304 instead of rebuilding and resending the figures.
+_json_lock = threading.Lock()
+_json_cache = {}
+
+
+def _loaded(dataset):
+    """A dataset's tables, or the error it failed to load with."""
+    try:
+        return dataset.get()
+    except DatasetUnavailable as e:
+        return e.error
+
+
+def cached_json(name, datasets, build):
+    """(ETag, JSON body) of build(*tables); rebuilt only when one of the datasets (re)loads.
+
+    build gets each dataset's tables, or its load error.
+    """
+    loaded = tuple(_loaded(dataset) for dataset in datasets)
+    with _json_lock:
+        cached = _json_cache.get(name)
+        if cached is None or any(a is not b for a, b in zip(cached[0], loaded)):
+            with stage("figures"):
+                body = to_json_plotly(build(*loaded)).encode("utf-8")
+            cached = _json_cache[name] = (loaded, hashlib.sha256(body).hexdigest()[:32], body)
+        return cached[1], cached[2]
+
+
+def json_response(payload):
+    etag, body = payload
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True  # always revalidate; unchanged data is a 304
+    return response.make_conditional(request)
+
+
+# ----------- OVERVIEW -----------
+# Nothing on the overview depends on user input: its KPIs and figures are one
+# cached JSON document, filled into a static page shell by loadOverview.
+OVERVIEW_PREVIEWS = {
+    "bls": (
+        bls_data, "kpi-total-usjobs",
+        lambda t: f"{int(t['bls_hierarchy'].total_employment):,}",
+        lambda t: px.bar(
+            t["bls_hierarchy"].top("major", "TOT_EMP", 15), x="OCC_TITLE", y="TOT_EMP",
+            labels={"OCC_TITLE": "Occupation Group", "TOT_EMP": "Total Employed"},
+            title="Top US Major Occupational Groups by Employment",
+            template="seaborn"
+        ),
+    ),
+    "itu": (
+        itu_data, "kpi-itu",
+        lambda t: f"{t['latest_itu']['OBS_VALUE'].median():.2f}",
+        lambda t: itu_choropleth(
+            t["latest_itu"], color_continuous_scale="Blues", title="Latest Digital Skill Indicator by Country",
+            labels={"OBS_VALUE": "Digital Skill Index"}
+        ),
+    ),
+    "onet": (
+        onet_data, "kpi-onet",
+        lambda t: t["top_onet_jobs"]['Title'].iloc[0] if len(t["top_onet_jobs"]) else "N/A",
+        lambda t: px.bar(
+            t["top_onet_jobs"], x="Title", y="O*NET-SOC Code",
+            labels={"Title": "Job Title", "O*NET-SOC Code": "Job Code"},
+            title="Top O*NET Computer-Related Occupations",
+            template="seaborn"
+        ),
+    ),
+}
+
+
+def _overview_previews(*loaded):
+    previews = {}
+    for (name, (_, _, kpi, figure)), tables in zip(OVERVIEW_PREVIEWS.items(), loaded):
+        if isinstance(tables, Exception):
+            previews[name] = {"kpi": "N/A", "figure": {}}
+        else:
+            previews[name] = {"kpi": kpi(tables), "figure": figure(tables)}
+    return previews
+
+
+def overview_payload():
+    """(ETag, JSON body) of the overview KPIs and figures."""
+    return cached_json("overview", [dataset for dataset, *_ in OVERVIEW_PREVIEWS.values()], _overview_previews)
+
+
+def _itu_map(tables):
+    if isinstance(tables, Exception):
+        return {}
+    latest_itu = tables["latest_itu"]
+    return itu_choropleth(
+        latest_itu, color_continuous_scale="Viridis", title="Global Digital Skills (ITU Indicator)",
+        labels={"OBS_VALUE": "Digital Skill Index"}
+    )
+
+
+def itu_map_payload():
+    """(ETag, JSON body) of the ITU choropleth; it does not depend on the page's top-N."""
+    return cached_json("itu_map", [itu_data], _itu_map)
+
+
+def _overview_preview(name):
+    """Preview graph, filled in by the browser; behind an alert if its dataset failed to load."""
+    graph = dcc.Graph(id=f"overview-{name}-graph")
+    try:
+        OVERVIEW_PREVIEWS[name][0].get()
+    except DatasetUnavailable as e:
+        return html.Div([unavailable_alert(e), html.Div(graph, hidden=True)])
+    return graph
+
+
 def overview_layout():
     return html.Div([
         html.H2("🌍 Digital Skills & Workforce Analytics", style={"fontWeight": 800}),
         html.P("Data sources: US BLS, O*NET, World Bank ITU. Explore workforce trends in digital skills and job demand."),
+        dcc.Store(id="overview-source", data={"url": OVERVIEW_ROUTE, "domains": list(OVERVIEW_PREVIEWS)}),
         dbc.Row([
             dbc.Col(dbc.Card([
                 dbc.CardHeader("US Total Jobs"),
-                dbc.CardBody([html.H4(f"{int(bls['TOT_EMP'].sum()):,}", id="kpi-total-usjobs", style={"fontWeight": 800})])
+                dbc.CardBody([html.H4("…", id="kpi-total-usjobs", style={"fontWeight": 800})])
             ], color="primary", inverse=True)),
             dbc.Col(dbc.Card([
                 dbc.CardHeader("World: Median Digital Adoption (ITU)"),
-                dbc.CardBody([html.H4(f"{latest_itu['OBS_VALUE'].median():.2f}", id="kpi-itu", style={"fontWeight": 800})])
+                dbc.CardBody([html.H4("…", id="kpi-itu", style={"fontWeight": 800})])
             ], color="info", inverse=True)),
             dbc.Col(dbc.Card([
                 dbc.CardHeader("Top O*NET Digital Jobs"),
-                dbc.CardBody([html.H4(top_onet_jobs['Title'].iloc[0] if len(top_onet_jobs) else "N/A", id="kpi-onet", style={"fontWeight": 800})])
+                dbc.CardBody([html.H4("…", id="kpi-onet", style={"fontWeight": 800})])
             ], color="success", inverse=True)),
         ], className="mb-4"),
         html.Hr(),
         html.H5("Quick Preview: US Job Market"),
-        dcc.Graph(figure=px.bar(
-            grouped_bls.sort_values("TOT_EMP", ascending=False).head(15), x="OCC_TITLE", y="TOT_EMP",
-            labels={"OCC_TITLE": "Occupation Group", "TOT_EMP": "Total Employed"},
-            title="Top US Occupational Groups by Employment",
-            template="seaborn"
-        )),
+        _overview_preview("bls"),
         html.H5("Quick Preview: Global Digital Skills"),
-        dcc.Graph(figure=px.choropleth(
-            latest_itu, locations="REF_AREA_LABEL", locationmode="country names", color="OBS_VALUE",
-            color_continuous_scale="Blues", title="Latest Digital Skill Indicator by Country",
-            labels={"OBS_VALUE": "Digital Skill Index"}
-        )),
+        _overview_preview("itu"),
         html.H5("Quick Preview: O*NET Digital Skills"),
-        dcc.Graph(figure=px.bar(
-            top_onet_jobs, x="Title", y="O*NET-SOC Code",
-            labels={"Title": "Job Title", "O*NET-SOC Code": "Job Code"},
-            title="Top O*NET Computer-Related Occupations",
-            template="seaborn"
-        )),
+        _overview_preview("onet"),
         html.Hr(),
         html.Div("Data: O*NET, US BLS, World Bank ITU | App by Dom Weber", style={"opacity": 0.75, "fontSize": "0.9rem"}),
     ])
@@ -160,6 +906,18 @@ def bls_layout():
     return html.Div([
         html.H2("🇺🇸 US Jobs & Digital Occupations (BLS)", style={"fontWeight": 800}),
         bls_explainer,
+        dcc.Dropdown(
+            id='bls-level-dropdown',
+            options=[{"label": label, "value": level} for level, label in BLS_LEVELS.items()],
+            value=DEFAULT_BLS_LEVEL,
+            clearable=False,
+            style={"maxWidth": "320px", "marginBottom": "1.2rem"}
+        ),
+        dcc.Dropdown(
+            id='bls-within-dropdown',
+            placeholder="Within: all groups",
+            style={"maxWidth": "520px", "marginBottom": "1.2rem"}
+        ),
         dcc.Dropdown(
             id='bls-sort-dropdown',
             options=sort_options,
@@ -167,6 +925,13 @@ def bls_layout():
             clearable=False,
             style={"maxWidth": "320px", "marginBottom": "1.2rem"}
         ),
+        dcc.Dropdown(
+            id='bls-topn-dropdown',
+            options=[{"label": f"Top {n} Groups", "value": n} for n in BLS_TOP_N_OPTIONS],
+            value=BLS_TOP_N_OPTIONS[0],
+            clearable=False,
+            style={"maxWidth": "320px", "marginBottom": "1.2rem"}
+        ),
         html.Span(
             [
                 html.I(className="bi bi-info-circle", id="bls-sort-help",
@@ -174,12 +939,12 @@ def bls_layout():
             ]
         ),
         dbc.Tooltip(
-            "Choose how to sort the Top 15 groups: by Employment (most jobs) or by Median Salary (highest paid).",
+            "Choose how to sort the top groups: by Employment (most jobs) or by Median Salary (highest paid).",
             target="bls-sort-help",
             placement="right"
         ),
         dbc.Tooltip(
-            "Choose how to sort the top 15 occupations: by number of jobs or by highest median salary.",
+            "Choose how to sort the top occupations: by number of jobs or by highest median salary.",
             target='bls-sort-dropdown',
             placement="right"
         ),
@@ -198,6 +963,7 @@ def itu_layout():
             clearable=False,
             style={"maxWidth": "320px", "marginBottom": "1.2rem"}
         ),
+        dcc.Store(id="itu-map-source", data=ITU_MAP_ROUTE),
         dcc.Graph(id="itu-choropleth"),
         html.H5("Preview: Top Countries by Digital Skill Index"),
         html.Div(id="itu-table"),
@@ -221,6 +987,17 @@ def onet_layout():
             clearable=False,
             style={"maxWidth": "320px", "marginBottom": "1.2rem"}
         ),
+        dbc.Input(
+            id="onet-keywords",
+            value=DEFAULT_ONET_QUERY,
+            placeholder="Skill keywords, e.g. python OR data analy*",
+            debounce=True,
+            style={"maxWidth": "520px", "marginBottom": "0.4rem"}
+        ),
+        html.Div(
+            "Matches technology names and examples. Words must all appear; use OR for alternatives and * for prefixes.",
+            style={"fontSize": "0.9rem", "color": "#64748b", "marginBottom": "1.2rem"}
+        ),
         dcc.Graph(id="onet-bar"),
         html.H5("Preview: Top Digital Occupations"),
         html.Div(id="onet-table"),
@@ -233,6 +1010,73 @@ def onet_layout():
     ])
 
 
+TABLE_STYLES = dict(
+    style_table={"overflowX": "auto"},
+    style_cell={"fontFamily": "Segoe UI,Roboto,Arial,sans-serif", "fontSize": 15, "color": "#101828",
+                "backgroundColor": "#fff", "textAlign": "left", "whiteSpace": "normal", "height": "auto"},
+    style_header={"fontWeight": "bold", "backgroundColor": "#0a2540", "color": "#fff"},
+    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#f9fafb'}],
+)
+
+
+def occupation_href(code):
+    return f"{OCCUPATION_PATH}?{urlencode({'code': code})}"
+
+
+def occupation_layout(search=None):
+    store = onet_data["onet_store"]
+    code = parse_qs((search or "").lstrip("?")).get("code", [DEFAULT_OCCUPATION])[0]
+    if store.occ_id(code) is None:
+        code = DEFAULT_OCCUPATION
+    occupations = store.occupations
+    return html.Div([
+        html.H2("🔎 O*NET Occupation Explorer", style={"fontWeight": 800}),
+        html.P("Technology skills, tools, tasks, alternate titles and related occupations for one O*NET occupation."),
+        dcc.Dropdown(
+            id="occupation-dropdown",
+            options=[{"label": f"{t} ({c})", "value": c}
+                     for c, t in zip(occupations["O*NET-SOC Code"], occupations["Title"])],
+            value=code,
+            clearable=False,
+            style={"maxWidth": "640px", "marginBottom": "1.2rem"}
+        ),
+        html.Div(id="occupation-profile"),
+        html.Hr(),
+        html.Div("Source: US O*NET Database v29.1"),
+    ])
+
+
+def digital_demand_layout():
+    return html.Div([
+        html.H2("📈 Digital Demand: US Jobs × O*NET Technology", style={"fontWeight": 800}),
+        dcc.Markdown("""
+Detailed BLS occupations matched to O*NET on SOC code, combining employment and median salary with the
+technology skills O*NET lists for each occupation.
+- _"Hot Technologies"_ counts technologies O*NET flags as frequently requested by employers (average per O*NET occupation).
+- _"Employment-weighted"_ multiplies that by total employment, ranking where hot-technology demand touches the most jobs.
+""", style={"marginBottom": "1rem"}),
+        dcc.Dropdown(
+            id="demand-metric-dropdown",
+            options=[{"label": f"Rank by {label}", "value": m} for m, label in CROSSWALK_METRICS.items()],
+            value="WEIGHTED_HOT_DEMAND",
+            clearable=False,
+            style={"maxWidth": "420px", "marginBottom": "1.2rem"}
+        ),
+        dcc.Dropdown(
+            id="demand-topn-dropdown",
+            options=[{"label": f"Top {n} Occupations", "value": n} for n in BLS_TOP_N_OPTIONS],
+            value=BLS_TOP_N_OPTIONS[0],
+            clearable=False,
+            style={"maxWidth": "320px", "marginBottom": "1.2rem"}
+        ),
+        dcc.Graph(id="demand-bar"),
+        html.Div(id="demand-table"),
+        html.Hr(),
+        html.Div("Sources: US Bureau of Labor Statistics (BLS OEWS 2024), US O*NET Database v29.1",
+                 style={"fontSize": "1rem", "opacity": 0.85}),
+    ])
+
+
 # ----------- SET APP LAYOUT (move this here BEFORE any callback definitions!) -----------
 app.layout = html.Div([
     dcc.Location(id="url"),
@@ -241,18 +1085,36 @@ app.layout = html.Div([
 ])
 
 # ----------- CALLBACKS (MUST come AFTER app.layout is set) -----------
+@app.callback(
+    [Output('bls-within-dropdown', 'options'),
+     Output('bls-within-dropdown', 'value'),
+     Output('bls-within-dropdown', 'disabled')],
+    Input('bls-level-dropdown', 'value')
+)
+def update_bls_within_options(level):
+    hierarchy = bls_data["bls_hierarchy"]
+    options = [{"label": f"{code} {hierarchy.titles[code]}", "value": code} for code in hierarchy.groups[level]]
+    return options, None, not options
+
+
 @app.callback(
     Output('bls-dynamic-content', 'children'),
-    Input('bls-sort-dropdown', 'value')
+    [Input('bls-sort-dropdown', 'value'),
+     Input('bls-topn-dropdown', 'value'),
+     Input('bls-level-dropdown', 'value'),
+     Input('bls-within-dropdown', 'value')]
 )
 
-def update_bls_section(sort_by):
-    sorted_bls = grouped_bls[~grouped_bls["OCC_TITLE"].str.contains("All Occupations", case=False, na=False)].copy()
-    sorted_bls = sorted_bls.sort_values(sort_by, ascending=False).head(15)
+def update_bls_section(sort_by, top_n=BLS_TOP_N_OPTIONS[0], level=DEFAULT_BLS_LEVEL, within=None):
+    with stage("filter") as s:
+        sorted_bls = top_bls(sort_by, top_n, level, within)
+        s.rows = len(sorted_bls)
     if sorted_bls.empty:
-        sorted_bls = pd.DataFrame(columns=["OCC_TITLE", "TOT_EMP", "A_MEDIAN"])
+        sorted_bls = pd.DataFrame(columns=["OCC_CODE", "OCC_TITLE", "TOT_EMP", "A_MEDIAN"])
+    scope = BLS_LEVELS[level] + (f" in {bls_data['bls_hierarchy'].titles[within]}" if within else "")
 
     table_columns = [
+        {"name": "SOC Code", "id": "OCC_CODE"},
         {"name": "Occupation Title", "id": "OCC_TITLE"},
         {"name": "Total Employed", "id": "TOT_EMP", "type": "numeric",
          "format": Format(group=True, scheme=Scheme.fixed, precision=0)},
@@ -277,6 +1139,16 @@ def update_bls_section(sort_by):
     sorted_bls.columns = [c.strip().upper() for c in sorted_bls.columns]
     # -----------------------------
 
+    with stage("figures"):
+        bar_fig = px.bar(
+            sorted_bls, x="OCC_TITLE", y=sort_by,
+            labels={"OCC_TITLE": "Occupation Group", sort_by: ("Total Employed" if sort_by == "TOT_EMP" else "Median Salary ($)")},
+            color=sort_by, color_continuous_scale="Blues" if sort_by=="TOT_EMP" else "Viridis",
+            template="seaborn"
+        )
+    with stage("boxplot"):
+        boxplot = boxplot_component(sort_by, top_n, sorted_bls, level, within)
+
     return [
         dbc.Row([
             dbc.Col([
@@ -315,26 +1187,15 @@ def update_bls_section(sort_by):
             style={"fontSize": "0.95rem", "color": "#64748b", "marginBottom": "10px"}
         ),
 
-        html.H5(f"Top 15 US Occupational Groups by {'Employment' if sort_by=='TOT_EMP' else 'Median Salary'}"),
-        dcc.Graph(
-            figure=px.bar(
-                sorted_bls, x="OCC_TITLE", y=sort_by,
-                labels={"OCC_TITLE": "Occupation Group", sort_by: ("Total Employed" if sort_by == "TOT_EMP" else "Median Salary ($)")},
-                color=sort_by, color_continuous_scale="Blues" if sort_by=="TOT_EMP" else "Viridis",
-                template="seaborn"
-            ),
-            style={"height": "480px"}
-        ),
+        html.H5(f"Top {top_n} US {scope} by {'Employment' if sort_by=='TOT_EMP' else 'Median Salary'}"),
+        dcc.Graph(figure=bar_fig, style={"height": "480px"}),
 
         html.Div([
             html.H5("Salary Distribution (Boxplot)"),
-            html.Img(src=boxplot_img(sorted_bls), style={
-                "width": "99%", "maxWidth": "1200px", "marginBottom": "1.5rem", "borderRadius": "10px",
-                "boxShadow": "0 2px 12px rgba(0,0,0,0.12)"
-            }),
+            boxplot,
         ]),
 
-        html.H5("Preview: Top 15 Job Groups"),
+        html.H5(f"Preview: Top {top_n} {scope}"),
         dash_table.DataTable(
             data=sorted_bls.to_dict('records'),
             columns=table_columns,
@@ -367,27 +1228,37 @@ def update_bls_section(sort_by):
 @app.callback(
     Output("bls-download-data", "data"),
     Input("bls-download-btn", "n_clicks"),
-    State('bls-sort-dropdown', 'value'),
+    [State('bls-sort-dropdown', 'value'),
+     State('bls-topn-dropdown', 'value'),
+     State('bls-level-dropdown', 'value'),
+     State('bls-within-dropdown', 'value')],
     prevent_initial_call=True
 )
-def download_bls_top15(n_clicks, sort_by):
-    sorted_bls = grouped_bls[~grouped_bls["OCC_TITLE"].str.contains("All Occupations", case=False, na=False)]
-    sorted_bls = sorted_bls.sort_values(sort_by, ascending=False).head(15)
-    return dcc.send_data_frame(sorted_bls.to_csv, "bls_top15.csv", index=False)
+def download_bls_top_n(n_clicks, sort_by, top_n, level=DEFAULT_BLS_LEVEL, within=None):
+    with stage("filter") as s:
+        sorted_bls = top_bls(sort_by, top_n, level, within)
+        s.rows = len(sorted_bls)
+    file_name = f"bls_{level}{'_' + within if within else ''}_top{top_n}.csv"
+    return dcc.send_data_frame(sorted_bls.to_csv, file_name, index=False)
 
 # --- ITU Callback for Global Digital Skills Page ---
+# The map itself is loaded once from ITU_MAP_ROUTE; top_n only changes the table.
+app.clientside_callback(
+    ClientsideFunction(namespace="skills_pulse", function_name="loadFigure"),
+    Output("itu-choropleth", "figure"),
+    Input("itu-map-source", "data"),
+)
+
+
 @app.callback(
-    [Output("itu-choropleth", "figure"),
-     Output("itu-table", "children")],
+    Output("itu-table", "children"),
     [Input("itu-topn-dropdown", "value")]
 )
 def update_itu_section(top_n):
-    top_countries = latest_itu.sort_values("OBS_VALUE", ascending=False).head(top_n)
-    fig = px.choropleth(
-        latest_itu, locations="REF_AREA_LABEL", locationmode="country names", color="OBS_VALUE",
-        color_continuous_scale="Viridis", title="Global Digital Skills (ITU Indicator)",
-        labels={"OBS_VALUE": "Digital Skill Index"}
-    )
+    tables = itu_data.get()
+    with stage("filter") as s:
+        top_countries = tables["latest_itu"].iloc[tables["itu_ranking"][:top_n]]
+        s.rows = len(top_countries)
     table = dash_table.DataTable(
         data=top_countries[["REF_AREA_LABEL", "OBS_VALUE"]].rename(
             columns={"REF_AREA_LABEL": "Country", "OBS_VALUE": "Digital Skill Index"}
@@ -412,33 +1283,40 @@ def update_itu_section(top_n):
             }
         ]
     )
-    return fig, table
+    return table
 
 # --- O*NET Callback for Digital Jobs Page ---
 @app.callback(
     [Output("onet-bar", "figure"),
      Output("onet-table", "children")],
-    [Input("onet-topn-dropdown", "value")]
+    [Input("onet-topn-dropdown", "value"),
+     Input("onet-keywords", "value")]
 )
-def update_onet_section(top_n):
-    digital_counts = onet_tech[onet_tech['Commodity Title'].str.contains(
-        "Computer|Software|Python|AI", na=False, case=False)
-    ]['O*NET-SOC Code'].value_counts().reset_index()
-    digital_counts.columns = ['O*NET-SOC Code', 'Count']
-
-    merged = pd.merge(digital_counts, onet_occ, left_on='O*NET-SOC Code', right_on='O*NET-SOC Code', how='left')
-    merged = merged[['Title', 'O*NET-SOC Code', 'Count']].head(top_n)
-
-    fig = px.bar(
-        merged, x='Title', y='Count',
-        labels={'Title': 'Job Title', 'Count': 'Digital Skills Mentioned'},
-        title=f"Top {top_n} O*NET Digital Occupations",
-        template="seaborn"
-    )
+def update_onet_section(top_n, query=DEFAULT_ONET_QUERY):
+    # A cleared input sends None (or blank text): show the default digital query.
+    query = (query or "").strip() or DEFAULT_ONET_QUERY
+    with stage("filter") as s:
+        merged = match_occupations(onet_data.get(), query, top_n)
+        s.rows = len(merged)
+
+    if query == DEFAULT_ONET_QUERY:
+        title = f"Top {top_n} O*NET Digital Occupations"
+        count_label = "Digital Skills Mentioned"
+    else:
+        title = f"Top {top_n} O*NET Occupations Matching \"{query}\"" if len(merged) else f"No occupations match \"{query}\""
+        count_label = f"Skills Matching \"{query}\""
+    with stage("figures"):
+        fig = px.bar(
+            merged, x='Title', y='Count',
+            labels={'Title': 'Job Title', 'Count': count_label},
+            title=title,
+            template="seaborn"
+        )
     table = dash_table.DataTable(
-        data=merged.to_dict('records'),
+        data=merged.assign(Title=[f"[{t}]({occupation_href(c)})" for t, c in
+                                  zip(merged["Title"], merged["O*NET-SOC Code"])]).to_dict('records'),
         columns=[
-            {"name": "Job Title", "id": "Title"},
+            {"name": "Job Title", "id": "Title", "presentation": "markdown"},
             {"name": "O*NET Code", "id": "O*NET-SOC Code"},
             {"name": "Skill Mentions", "id": "Count"},
         ],
@@ -462,18 +1340,148 @@ def update_onet_section(top_n):
 
 
 
-@app.callback(Output("page-content", "children"), [Input("url", "pathname")])
-def render_page(pathname):
+# --- O*NET Occupation Explorer ---
+@app.callback(
+    Output("occupation-profile", "children"),
+    Input("occupation-dropdown", "value")
+)
+def update_occupation_profile(code):
+    store = onet_data["onet_store"]
+    occ_id = store.occ_id(code)
+    if occ_id is None:
+        return html.Div("Unknown occupation.")
+    with stage("filter"):
+        occupation = store.occupations.iloc[occ_id]
+        tech = store.rows("onet_tech", occ_id)
+        tools = store.rows("onet_tools", occ_id)
+        tasks = store.rows("onet_tasks", occ_id)
+        alt_titles = store.rows("onet_alt_titles", occ_id)
+        related = store.related(occ_id)
+
+    zone = occupation["Job Zone"]
+    zone_name = store.job_zones["Name"].get(zone, "Job Zone not assigned") if pd.notna(zone) else "Job Zone not assigned"
+    hot = tech["Hot Technology"].eq("Y")
+    tech_table = tech.assign(Hot=np.where(hot, "🔥", ""))[["Example", "Commodity Title", "Hot"]]
+    tech_table = tech_table.iloc[np.argsort(~hot.to_numpy(), kind="stable")]
+    core_tasks = tasks[tasks["Task Type"].eq("Core")]["Task"]
+
+    def kpi(label, value, color):
+        return dbc.Col(dbc.Card([
+            dbc.CardHeader(label),
+            dbc.CardBody(html.H4(f"{value:,}", style={"fontWeight": 800}))
+        ], color=color, inverse=True))
+
+    return [
+        html.H3(occupation["Title"], style={"fontWeight": 800}),
+        dbc.Badge(zone_name, color="info", className="mb-2"),
+        html.P(occupation["Description"]),
+        dbc.Row([
+            kpi("Technologies", len(tech), "primary"),
+            kpi("Hot Technologies", int(hot.sum()), "danger"),
+            kpi("Tools", len(tools), "info"),
+            kpi("Tasks", len(tasks), "success"),
+        ], className="mb-4"),
+        html.H5("Technology Skills"),
+        dash_table.DataTable(
+            data=tech_table.to_dict('records'),
+            columns=[{"name": "Technology", "id": "Example"}, {"name": "Category", "id": "Commodity Title"},
+                     {"name": "Hot", "id": "Hot"}],
+            page_size=15, sort_action="native", **TABLE_STYLES
+        ),
+        html.H5("Core Tasks", className="mt-4"),
+        html.Ul([html.Li(t) for t in core_tasks.head(12)]),
+        html.H5("Tools Used", className="mt-4"),
+        html.P(", ".join(tools["Example"].head(30)) or "None listed."),
+        html.H5("Also Known As", className="mt-4"),
+        html.P(", ".join(alt_titles["Alternate Title"].head(30)) or "None listed."),
+        html.H5("Related Occupations", className="mt-4"),
+        html.Ul([
+            html.Li([dcc.Link(r["Title"], href=occupation_href(r["O*NET-SOC Code"])), f" ({r['Tier']})"])
+            for _, r in related.head(20).iterrows()
+        ]),
+    ]
+
+
+# --- BLS x O*NET Digital Demand ---
+@app.callback(
+    [Output("demand-bar", "figure"),
+     Output("demand-table", "children")],
+    [Input("demand-metric-dropdown", "value"),
+     Input("demand-topn-dropdown", "value")]
+)
+def update_digital_demand(metric, top_n):
+    with stage("filter") as s:
+        ranked = top_crosswalk(metric, top_n)
+        s.rows = len(ranked)
+    with stage("figures"):
+        fig = px.bar(
+            ranked, x="OCC_TITLE", y=metric,
+            hover_data=["TOT_EMP", "A_MEDIAN", "HOT_TECHNOLOGIES"],
+            labels={"OCC_TITLE": "Occupation", metric: CROSSWALK_METRICS[metric], "TOT_EMP": "Total Employed",
+                    "A_MEDIAN": "Median Salary ($)", "HOT_TECHNOLOGIES": "Hot Technologies"},
+            title=f"Top {top_n} Occupations by {CROSSWALK_METRICS[metric]}",
+            color=metric, color_continuous_scale="Blues", template="seaborn"
+        )
+    table = dash_table.DataTable(
+        data=ranked.round({"HOT_TECHNOLOGIES": 1, "DIGITAL_SKILLS": 1, "HOT_SHARE": 3}).to_dict('records'),
+        columns=[
+            {"name": "SOC Code", "id": "OCC_CODE"},
+            {"name": "Occupation", "id": "OCC_TITLE"},
+            {"name": "Total Employed", "id": "TOT_EMP", "type": "numeric",
+             "format": Format(group=True, scheme=Scheme.fixed, precision=0)},
+            {"name": "Median Salary ($)", "id": "A_MEDIAN", "type": "numeric", "format": FormatTemplate.money(0)},
+            {"name": "Hot Technologies", "id": "HOT_TECHNOLOGIES", "type": "numeric"},
+            {"name": "Hot Share", "id": "HOT_SHARE", "type": "numeric", "format": FormatTemplate.percentage(1)},
+            {"name": "Digital Skills", "id": "DIGITAL_SKILLS", "type": "numeric"},
+            {"name": "O*NET Occupations", "id": "ONET_OCCUPATIONS", "type": "numeric"},
+        ],
+        page_size=15, sort_action="native", **TABLE_STYLES
+    )
+    return fig, table
+
+
+@app.server.route(OVERVIEW_ROUTE)
+def overview_json():
+    return json_response(overview_payload())
+
+
+@app.server.route(ITU_MAP_ROUTE)
+def itu_map_json():
+    return json_response(itu_map_payload())
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace="skills_pulse", function_name="loadOverview"),
+    [Output(f"overview-{name}-graph", "figure") for name in OVERVIEW_PREVIEWS]
+    + [Output(kpi_id, "children") for _, kpi_id, _, _ in OVERVIEW_PREVIEWS.values()],
+    Input("overview-source", "data"),
+)
+
+
+@app.callback(Output("page-content", "children"), [Input("url", "pathname"), Input("url", "search")])
+def render_page(pathname, search=None):
     if pathname == "/" or pathname is None:
         return overview_layout()
-    elif pathname == "/us-jobs":
-        return bls_layout()
-    elif pathname == "/global-skills":
-        return itu_layout()
-    elif pathname == "/onet":
-        return onet_layout()
-    else:
+    pages = {
+        "/us-jobs": (bls_data, bls_layout),
+        "/global-skills": (itu_data, itu_layout),
+        "/onet": (onet_data, onet_layout),
+        OCCUPATION_PATH: (onet_data, lambda: occupation_layout(search)),
+        DIGITAL_DEMAND_PATH: (crosswalk_data, digital_demand_layout),
+    }
+    if pathname not in pages:
         return html.Div([html.H2("404: Page Not Found")])
+    dataset, layout = pages[pathname]
+    try:
+        dataset.get()
+    except DatasetUnavailable as e:
+        return unavailable_alert(e)
+    return layout()
 
 if __name__ == "__main__":
+    # Shows the per-dataset load times; under a WSGI server the server's logging config applies.
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves requests.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_datasets()
     app.run(debug=True)
@@ -6,36 +6,636 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import dash
-from dash import Dash, dcc, html, Input, Output, State, ctx, dash_table
+from dash import Dash, dcc, html, Input, Output, State, Patch, ClientsideFunction, ctx, dash_table
 import dash_bootstrap_components as dbc
 from datetime import timedelta
-from io import BytesIO
-import base64
+from functools import cached_property, lru_cache
+from urllib.parse import urlencode
+import copy
+import importlib.util
+import json
+import os
+import tempfile
+import threading
 import openpyxl
+from flask import Response, abort, request, stream_with_context
+
+from instrumentation import instrument, stage
 
 
 # --- 1. Synthetic Healthcare Data ---
-np.random.seed(42)
-n_patients = 5000
-start_date = pd.to_datetime('2022-01-01')
-end_date = pd.to_datetime('2023-12-31')
-dates = pd.to_datetime(np.random.choice(pd.date_range(start_date, end_date), n_patients))
-genders = np.random.choice(['Male', 'Female', 'Other'], n_patients, p=[0.48, 0.48, 0.04])
-diag_groups = np.random.choice(['Cardio', 'Neuro', 'Ortho', 'Respiratory', 'Gastro'], n_patients)
-costs = np.random.normal(loc=8000, scale=2500, size=n_patients)
-costs = np.round(np.clip(costs, 1000, 25000), 2)
-outcomes = np.random.choice(['Recovered', 'Readmitted', 'Complication', 'Deceased'], n_patients, p=[0.75, 0.12, 0.1, 0.03])
-
-patients = pd.DataFrame({
-    'PatientID': np.arange(1, n_patients+1),
-    'AdmissionDate': dates,
-    'Gender': genders,
-    'Diagnosis': diag_groups,
-    'Cost': costs,
-    'Outcome': outcomes
-})
-
-# --- 2. Theme Helper (colors, dropdowns, etc.) ---
+def synthetic_patients(n_patients=5000, seed=42):
+    np.random.seed(seed)
+    start_date = pd.to_datetime('2022-01-01')
+    end_date = pd.to_datetime('2023-12-31')
+    dates = pd.to_datetime(np.random.choice(pd.date_range(start_date, end_date), n_patients))
+    genders = np.random.choice(['Male', 'Female', 'Other'], n_patients, p=[0.48, 0.48, 0.04])
+    diag_groups = np.random.choice(['Cardio', 'Neuro', 'Ortho', 'Respiratory', 'Gastro'], n_patients)
+    costs = np.random.normal(loc=8000, scale=2500, size=n_patients)
+    costs = np.round(np.clip(costs, 1000, 25000), 2)
+    outcomes = np.random.choice(['Recovered', 'Readmitted', 'Complication', 'Deceased'], n_patients, p=[0.75, 0.12, 0.1, 0.03])
+
+    return pd.DataFrame({
+        'PatientID': np.arange(1, n_patients+1),
+        'AdmissionDate': dates,
+        'Gender': genders,
+        'Diagnosis': diag_groups,
+        'Cost': costs,
+        'Outcome': outcomes
+    })
+
+# --- 2. Columnar Patient Store ---
+PATIENT_COLUMNS = ('PatientID', 'AdmissionDate', 'Gender', 'Diagnosis', 'Cost', 'Outcome')
+CATEGORICAL_COLUMNS = ('Gender', 'Diagnosis', 'Outcome')
+NPY_CATEGORIES_FILE = 'categories.json'
+BITMAP_COLUMNS = ('Diagnosis', 'Gender')
+
+
+class BitmapIndex:
+    """One packed bitmap (little-endian uint64 words) per category code.
+
+    Bit i of a category's bitmap is set when row i has that code, so a
+    multi-select is an OR of a few word arrays and combining filters is an AND.
+    """
+
+    def __init__(self, codes, n_categories):
+        self.bitmaps = np.zeros((n_categories, 0), dtype='<u8')
+        self.update(codes, n_categories, 0)
+
+    @property
+    def nbytes(self):
+        return self.bitmaps.nbytes
+
+    def update(self, codes, n_categories, start):
+        """(Re)build the words covering rows [start, len(codes)), e.g. after an append."""
+        n_words = -(-len(codes) // 64)
+        rows, words = self.bitmaps.shape
+        if rows < n_categories or words < n_words:
+            grown = np.zeros((n_categories, max(n_words, 2 * words)), dtype='<u8')
+            grown[:rows, :words] = self.bitmaps
+            self.bitmaps = grown
+        w0 = start // 64
+        tail = codes[w0 * 64:]
+        for k in range(n_categories):
+            packed = np.packbits(tail == k, bitorder='little')
+            self.bitmaps[k, w0:].view(np.uint8)[:len(packed)] = packed
+
+    def union(self, wanted, w0, w1):
+        """OR of the bitmaps for category codes `wanted`, words [w0, w1)."""
+        return np.bitwise_or.reduce(self.bitmaps[wanted, w0:w1], axis=0)
+
+
+def code_dtype(n_categories):
+    """Smallest signed integer dtype that holds codes for n_categories labels."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"Too many categories: {n_categories}")
+
+
+def encode_categories(values, categories, col):
+    """Codes of `values` in `categories`; missing values are rejected, not coded -1."""
+    codes = pd.Categorical(values, categories=categories).codes
+    missing = int((codes < 0).sum())
+    if missing:
+        raise ValueError(f"Patient data has {missing} missing {col} value(s)")
+    return codes.astype(code_dtype(len(categories)))
+
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class RowSet:
+    """Rows of one filter selection, kept compact until they are read.
+
+    A date-only selection is just its slice of the date-sorted store; with
+    dropdown filters it also holds the AND-ed bitmap words covering that
+    slice (bits outside it cleared), one bit per row in the range.  Row
+    indices are built a chunk at a time by `chunks`.
+    """
+
+    def __init__(self, window, words=None):
+        self.window = window
+        self.words = words
+        if words is None:
+            self.count = window.stop - window.start
+        else:
+            words.flags.writeable = False
+            self.count = int(_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return 0 if self.words is None else self.words.nbytes
+
+    def chunks(self, size):
+        """Row indices in store order, at most max(size, 64) per chunk (slices for a date-only selection)."""
+        lo, hi = self.window.start, self.window.stop
+        if self.words is None:
+            for i in range(lo, hi, size):
+                yield slice(i, min(i + size, hi))
+            return
+        base, step = 64 * (lo // 64), max(1, size // 64)
+        for w in range(0, len(self.words), step):
+            bits = np.unpackbits(self.words[w:w + step].view(np.uint8), bitorder='little')
+            rows = base + 64 * w + np.flatnonzero(bits)
+            if len(rows):
+                yield rows
+
+    def indices(self):
+        """All rows at once: the slice itself, or an index array."""
+        if self.words is None:
+            return self.window
+        return np.concatenate([np.empty(0, dtype=np.int64), *self.chunks(1 << 20)])
+
+
+class PatientStore:
+    """Compact columnar copy of the patient table.
+
+    Categoricals are dictionary-encoded (sorted labels + the narrowest integer
+    codes that fit them, int8 for the usual handful of labels), IDs are
+    int32, costs float32 and admission dates datetime64[D].  Rows are kept
+    sorted by AdmissionDate so a date range is a binary-searched slice.
+    Callbacks filter on the integer codes and only build a DataFrame for the
+    rows they export.
+
+    Columns live in over-allocated buffers so `append` of new admissions is
+    amortised O(batch); `version` increases with every append.  Rows already
+    stored are never overwritten in place (a re-sort writes new buffers), so
+    a `snapshot` stays valid while appends continue.
+    """
+
+    def __init__(self, patient_id, admission_date, cost, codes, categories):
+        # Memory-mapped inputs that are already date-sorted are used as-is,
+        # so every worker process shares the same pages (until the first append).
+        if len(admission_date) and not np.all(admission_date[1:] >= admission_date[:-1]):
+            order = np.argsort(admission_date, kind='stable')
+            patient_id, admission_date, cost = patient_id[order], admission_date[order], cost[order]
+            codes = {col: c[order] for col, c in codes.items()}
+        self._columns = {'PatientID': patient_id, 'AdmissionDate': admission_date, 'Cost': cost}
+        self._columns.update((col, codes[col]) for col in CATEGORICAL_COLUMNS)
+        self._n = len(patient_id)
+        self.version = 0
+        self.categories = {col: np.asarray(labels, dtype=object) for col, labels in categories.items()}
+        self.bitmaps = {
+            col: BitmapIndex(self.codes[col], len(self.categories[col])) for col in BITMAP_COLUMNS
+        }
+
+    @property
+    def patient_id(self):
+        return self._columns['PatientID'][:self._n]
+
+    @property
+    def admission_date(self):
+        return self._columns['AdmissionDate'][:self._n]
+
+    @property
+    def cost(self):
+        return self._columns['Cost'][:self._n]
+
+    @property
+    def codes(self):
+        return {col: self._columns[col][:self._n] for col in CATEGORICAL_COLUMNS}
+
+    @classmethod
+    def from_frame(cls, df):
+        missing = [c for c in PATIENT_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Patient data is missing columns: {', '.join(missing)}")
+        codes, categories = {}, {}
+        for col in CATEGORICAL_COLUMNS:
+            categories[col] = sorted(df[col].dropna().unique())
+            codes[col] = encode_categories(df[col], categories[col], col)
+        return cls(
+            df['PatientID'].to_numpy(dtype=np.int32),
+            df['AdmissionDate'].to_numpy(dtype='datetime64[D]'),
+            df['Cost'].to_numpy(dtype=np.float32),
+            codes, categories,
+        )
+
+    @classmethod
+    def from_npy(cls, path):
+        """Memory-map a directory written by save_npy (one .npy file per column)."""
+        def column(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+        with open(os.path.join(path, NPY_CATEGORIES_FILE)) as f:
+            categories = json.load(f)
+        return cls(
+            column('PatientID'), column('AdmissionDate'), column('Cost'),
+            {col: column(col) for col in CATEGORICAL_COLUMNS}, categories,
+        )
+
+    def save_npy(self, path):
+        os.makedirs(path, exist_ok=True)
+        columns = {'PatientID': self.patient_id, 'AdmissionDate': self.admission_date, 'Cost': self.cost, **self.codes}
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(values))
+        with open(os.path.join(path, NPY_CATEGORIES_FILE), 'w') as f:
+            json.dump({col: list(labels) for col, labels in self.categories.items()}, f)
+
+    def __len__(self):
+        return self._n
+
+    def snapshot(self):
+        """Read-only view of the current rows that later appends leave untouched.
+
+        Appends only write past the current rows, a re-sort or a wider code
+        column writes new buffers and new labels a new category array, so the
+        view needs no copy.  It has no bitmap indexes: use it for to_frame.
+        """
+        view = copy.copy(self)
+        view._columns = {name: buf[:self._n] for name, buf in self._columns.items()}
+        view.categories = dict(self.categories)
+        view.bitmaps = {}
+        return view
+
+    def _reserve(self, size):
+        """Grow the column buffers (doubling) so they can hold `size` rows."""
+        for name, buf in self._columns.items():
+            if len(buf) < size or not buf.flags.writeable:
+                grown = np.empty(max(size, 2 * len(buf)), dtype=buf.dtype)
+                grown[:self._n] = buf[:self._n]
+                self._columns[name] = grown
+
+    def _encode_batch(self, df):
+        """Validate and encode a batch of admissions without changing the store.
+
+        Returns (column arrays, category dictionaries including new labels);
+        raises ValueError for missing columns or values and unconvertible types.
+        """
+        missing = [c for c in PATIENT_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Patient data is missing columns: {', '.join(missing)}")
+        nulls = [c for c in PATIENT_COLUMNS if df[c].isna().any()]
+        if nulls:
+            raise ValueError(f"Patient data has missing values in: {', '.join(nulls)}")
+        try:
+            patient_id = pd.to_numeric(df['PatientID'])
+            if not (patient_id % 1 == 0).all():
+                raise ValueError("PatientID must be whole numbers")
+            info = np.iinfo(np.int32)
+            if len(patient_id) and (patient_id.min() < info.min or patient_id.max() > info.max):
+                raise ValueError("PatientID is out of range")
+            batch = {
+                'PatientID': patient_id.to_numpy(dtype=np.int32),
+                'AdmissionDate': pd.to_datetime(df['AdmissionDate']).to_numpy(dtype='datetime64[D]'),
+                'Cost': pd.to_numeric(df['Cost']).to_numpy(dtype=np.float32),
+            }
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid patient data: {e}") from None
+        categories = dict(self.categories)
+        for col in CATEGORICAL_COLUMNS:
+            if not df[col].map(lambda v: isinstance(v, str)).all():
+                raise ValueError(f"{col} values must be strings")
+            new = sorted(set(df[col].unique()) - set(categories[col]))
+            if new:
+                categories[col] = np.concatenate([categories[col], np.asarray(new, dtype=object)])
+            batch[col] = encode_categories(df[col], categories[col], col)
+        return batch, categories
+
+    def append(self, df):
+        """Append a batch of new admissions.
+
+        Admissions dated on or after the latest stored date are written after
+        the existing rows in amortised O(batch); an older admission forces a
+        full re-sort.  Labels not seen before extend the category dictionaries.
+        The whole batch is validated first, so an invalid one changes nothing.
+        Returns the first row index that changed (0 after a re-sort).
+        """
+        batch, self.categories = self._encode_batch(df)
+        for col in CATEGORICAL_COLUMNS:
+            if batch[col].dtype.itemsize > self._columns[col].dtype.itemsize:
+                # More labels than the current code width holds: widen the column.
+                self._columns[col] = self._columns[col].astype(batch[col].dtype)
+        order = np.argsort(batch['AdmissionDate'], kind='stable')
+        n, size = self._n, self._n + len(order)
+        in_order = n == 0 or not len(order) or batch['AdmissionDate'][order[0]] >= self.admission_date[-1]
+        self._reserve(size)
+        for name, values in batch.items():
+            self._columns[name][n:size] = values[order]
+        start = n
+        if not in_order:
+            # New buffers, not an in-place shuffle: snapshots hold the old ones.
+            resort = np.argsort(self._columns['AdmissionDate'][:size], kind='stable')
+            for name, buf in self._columns.items():
+                resorted = np.empty_like(buf)
+                resorted[:size] = buf[:size][resort]
+                self._columns[name] = resorted
+            start = 0
+        self._n = size
+        for col, index in self.bitmaps.items():
+            index.update(self.codes[col], len(self.categories[col]), start)
+        self.version += 1
+        return start
+
+    def checkpoint(self):
+        """State that `restore` returns the store to, e.g. if a later ingest step fails."""
+        return dict(self._columns), self._n, dict(self.categories), self.version
+
+    def restore(self, checkpoint):
+        columns, self._n, categories, self.version = checkpoint
+        self._columns, self.categories = dict(columns), dict(categories)
+        for col, index in self.bitmaps.items():
+            index.update(self.codes[col], len(self.categories[col]), 0)
+
+    @property
+    def nbytes(self):
+        arrays = [self.patient_id, self.admission_date, self.cost, *self.codes.values()]
+        labels = sum(len(str(v)) for cats in self.categories.values() for v in cats)
+        bitmaps = sum(index.nbytes for index in self.bitmaps.values())
+        return sum(a.nbytes for a in arrays) + labels + bitmaps
+
+    def labels(self, col):
+        return list(self.categories[col])
+
+    def date_bounds(self):
+        return pd.Timestamp(self.admission_date[0]), pd.Timestamp(self.admission_date[-1])
+
+    def date_slice(self, start_date, end_date):
+        """Rows admitted in [start_date, end_date] as a slice, found in O(log n).
+
+        Indexing any column with the slice returns a view, not a copy.
+        """
+        lo, hi = 0, len(self)
+        if start_date is not None:
+            start = np.datetime64(pd.to_datetime(start_date).ceil('D'), 'D')
+            lo = int(np.searchsorted(self.admission_date, start, 'left'))
+        if end_date is not None:
+            end = np.datetime64(pd.to_datetime(end_date).floor('D'), 'D')
+            hi = int(np.searchsorted(self.admission_date, end, 'right'))
+        return slice(lo, max(lo, hi))
+
+    def match(self, diag_sel, gender_sel, start_date, end_date):
+        """RowSet of a dashboard filter selection.
+
+        The date range is resolved first; dropdown selections are then OR-ed
+        bitmaps AND-ed together over the words covering that range only.
+        """
+        window = self.date_slice(start_date, end_date)
+        lo, hi = window.start, window.stop
+        w0, w1 = lo // 64, -(-hi // 64)
+        words = None
+        for col, selected in (('Diagnosis', diag_sel), ('Gender', gender_sel)):
+            if selected:
+                wanted = np.flatnonzero(np.isin(self.categories[col], selected))
+                col_words = self.bitmaps[col].union(wanted, w0, w1)
+                words = col_words if words is None else words & col_words
+        if words is None:
+            return RowSet(window)
+        # Clear the bits of rows outside [lo, hi) in the first and last word.
+        if lo % 64:
+            words[0] &= np.uint64(~((1 << lo % 64) - 1) & (2**64 - 1))
+        if hi % 64 and len(words):
+            words[-1] &= np.uint64((1 << hi % 64) - 1)
+        return RowSet(window, words)
+
+    def select(self, diag_sel, gender_sel, start_date, end_date):
+        """Rows matching a dashboard filter selection, as a slice or row indices.
+
+        With no dropdown selection this is the date slice, so indexing a
+        column with it is a view.
+        """
+        return self.match(diag_sel, gender_sel, start_date, end_date).indices()
+
+    def to_frame(self, rows=None):
+        """Materialise rows (all rows if None) with the original column layout."""
+        take = slice(None) if rows is None else rows
+        cols = {
+            'PatientID': self.patient_id[take],
+            'AdmissionDate': self.admission_date[take].astype('datetime64[ns]'),
+        }
+        for col in ('Gender', 'Diagnosis'):
+            cols[col] = self.categories[col][self.codes[col][take]]
+        cols['Cost'] = np.round(self.cost[take].astype(np.float64), 2)
+        cols['Outcome'] = self.categories['Outcome'][self.codes['Outcome'][take]]
+        return pd.DataFrame(cols)
+
+
+def load_store(source=None):
+    """Build the patient store from HEALTHCARE_DATA, or synthetic data if unset.
+
+    `source` may be a directory of .npy column files (memory-mapped, see
+    PatientStore.save_npy), a Parquet file or dataset directory, or an
+    Arrow IPC/Feather file.
+    """
+    source = source or os.environ.get('HEALTHCARE_DATA')
+    if not source:
+        return PatientStore.from_frame(synthetic_patients())
+    if os.path.isfile(os.path.join(source, NPY_CATEGORIES_FILE)):
+        return PatientStore.from_npy(source)
+    ext = os.path.splitext(source)[1].lower()
+    if ext == '.parquet' or os.path.isdir(source):
+        return PatientStore.from_frame(pd.read_parquet(source, columns=list(PATIENT_COLUMNS)))
+    if ext in ('.arrow', '.feather', '.ipc'):
+        return PatientStore.from_frame(pd.read_feather(source, columns=list(PATIENT_COLUMNS)))
+    raise ValueError(f"Unsupported patient data source: {source}")
+
+
+store = load_store()
+
+# --- 3. Aggregation Cube (built once, sliced per callback) ---
+class FilterCube:
+    """Dense count / cost-sum cube keyed by (Diagnosis, Gender, Outcome, Day).
+
+    Every chart and KPI on the dashboard is a sum over some axes of this cube,
+    so a filter change costs O(categories x days) instead of O(patients).
+    """
+
+    def __init__(self, store):
+        self.diagnoses = store.categories['Diagnosis']
+        self.genders = store.categories['Gender']
+        self.outcomes = store.categories['Outcome']
+        self._set_days(pd.date_range(*store.date_bounds(), freq='D'))
+
+        shape = (len(self.diagnoses), len(self.genders), len(self.outcomes), len(self.days))
+        size = int(np.prod(shape))
+        flat = self._flat_index(store, 0)
+        self.count = np.bincount(flat, minlength=size).reshape(shape)
+        self.cost_sum = np.bincount(flat, weights=store.cost, minlength=size).reshape(shape)
+
+    def _set_days(self, days):
+        self.days = days
+        # Trend buckets per granularity: (bucket start dates, bucket index of each day)
+        self.periods = {'D': (self.days, np.arange(len(self.days)))}
+        for freq in ('W', 'M'):
+            periods = self.days.to_period(freq)
+            self.periods[freq] = (periods.unique().to_timestamp(), periods.asi8 - periods.asi8[0])
+
+    def _flat_index(self, store, start):
+        shape = (len(self.diagnoses), len(self.genders), len(self.outcomes), len(self.days))
+        return np.ravel_multi_index((
+            store.codes['Diagnosis'][start:],
+            store.codes['Gender'][start:],
+            store.codes['Outcome'][start:],
+            (store.admission_date[start:] - np.datetime64(self.days[0], 'D')).astype(np.int64),
+        ), shape)
+
+    def add_rows(self, store, start):
+        """Fold store rows [start, len(store)) into the cube in O(rows added).
+
+        A re-sorted store (start == 0) or a new category label rebuilds the cube.
+        """
+        labels = (store.categories['Diagnosis'], store.categories['Gender'], store.categories['Outcome'])
+        if start == 0 or any(len(new) != len(old) for new, old in zip(labels, (self.diagnoses, self.genders, self.outcomes))):
+            self.__init__(store)
+            return
+        last_day = pd.Timestamp(store.admission_date[-1])
+        if last_day > self.days[-1]:
+            extra = (last_day - self.days[-1]).days
+            pad = [(0, 0)] * 3 + [(0, extra)]
+            self.count = np.pad(self.count, pad)
+            self.cost_sum = np.pad(self.cost_sum, pad)
+            self._set_days(pd.date_range(self.days[0], last_day, freq='D'))
+        flat = self._flat_index(store, start)
+        np.add.at(self.count.reshape(-1), flat, 1)
+        np.add.at(self.cost_sum.reshape(-1), flat, store.cost[start:])
+
+    def _codes(self, labels, selected):
+        if not selected:
+            return np.arange(len(labels))
+        return np.flatnonzero(np.isin(labels, selected))
+
+    def _day_range(self, start_date, end_date):
+        lo = 0 if start_date is None else self.days.searchsorted(pd.to_datetime(start_date), 'left')
+        hi = len(self.days) if end_date is None else self.days.searchsorted(pd.to_datetime(end_date), 'right')
+        return lo, max(lo, hi)
+
+    def aggregate(self, diag_sel, gender_sel, start_date, end_date):
+        """Return every table the dashboard needs for one filter selection."""
+        d = self._codes(self.diagnoses, diag_sel)
+        g = self._codes(self.genders, gender_sel)
+        lo, hi = self._day_range(start_date, end_date)
+        count = self.count[np.ix_(d, g)][..., lo:hi]
+        cost = self.cost_sum[np.ix_(d, g)][..., lo:hi]
+
+        # Diagnosis x Gender average cost (groups with patients only)
+        dg_count = count.sum(axis=(2, 3))
+        dg_cost = cost.sum(axis=(2, 3))
+        di, gi = np.nonzero(dg_count)
+        avg_cost = pd.DataFrame({
+            'Diagnosis': self.diagnoses[d][di],
+            'Gender': self.genders[g][gi],
+            'Cost': dg_cost[di, gi] / dg_count[di, gi],
+        })
+
+        # Diagnosis x Outcome bubble table
+        do_count = count.sum(axis=(1, 3))
+        do_cost = cost.sum(axis=(1, 3))
+        di, oi = np.nonzero(do_count)
+        summary = pd.DataFrame({
+            'Diagnosis': self.diagnoses[d][di],
+            'Outcome': self.outcomes[oi],
+            'Count': do_count[di, oi],
+            'AvgCost': do_cost[di, oi] / do_count[di, oi],
+        })
+
+        # Outcome counts
+        o_count = do_count.sum(axis=0)
+        outcomes = pd.DataFrame({'Outcome': self.outcomes, 'Count': o_count})
+        outcomes = outcomes[outcomes['Count'] > 0].reset_index(drop=True)
+
+        # Mean cost per day / week / month
+        day_count = count.sum(axis=(0, 1, 2))
+        day_cost = cost.sum(axis=(0, 1, 2))
+        trend = {}
+        for freq, (starts, day_period) in self.periods.items():
+            idx = day_period[lo:hi]
+            p_count = np.bincount(idx, weights=day_count, minlength=len(starts))
+            p_cost = np.bincount(idx, weights=day_cost, minlength=len(starts))
+            has = p_count > 0
+            trend[freq] = pd.DataFrame({'Period': starts[has], 'Cost': p_cost[has] / p_count[has]})
+
+        total = int(o_count.sum())
+        total_cost = float(dg_cost.sum())
+        by_outcome = dict(zip(self.outcomes, o_count))
+        return {
+            'avg_cost': avg_cost,
+            'outcomes': outcomes,
+            'summary': summary,
+            'trend': trend,
+            'total': total,
+            'avg_cost_val': total_cost / total if total else None,
+            'recovered': by_outcome.get('Recovered', 0) / total if total else 0.0,
+            'readmitted': by_outcome.get('Readmitted', 0) / total if total else 0.0,
+        }
+
+
+cube = FilterCube(store)
+
+# --- 4. Shared Filter Selections (dashboard + export) ---
+def filter_key(diag_sel, gender_sel, start_date, end_date):
+    """Normalise raw callback filter values into a hashable cache key."""
+    return (
+        tuple(sorted(diag_sel or ())),
+        tuple(sorted(gender_sel or ())),
+        None if start_date is None else pd.Timestamp(start_date),
+        None if end_date is None else pd.Timestamp(end_date),
+    )
+
+
+class Selection:
+    """One filter selection, shared by every callback that sees the same inputs.
+
+    Dashboard aggregates and the matching RowSet are resolved on first use and
+    kept, so repeated updates and the export reuse what was already computed.
+    Only the compact RowSet is cached (at most one bit per row in the date
+    range), never the row indices themselves.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    @cached_property
+    def aggregates(self):
+        with data_lock:
+            return cube.aggregate(*self.key)
+
+    @cached_property
+    def matches(self):
+        with data_lock:
+            return store.match(*self.key)
+
+
+@lru_cache(maxsize=128)
+def _selection(key, version):
+    return Selection(key)
+
+
+def get_selection(diag_sel, gender_sel, start_date, end_date):
+    # The store version is part of the key, so appends never serve stale rows.
+    return _selection(filter_key(diag_sel, gender_sel, start_date, end_date), store.version)
+
+
+def selection_cache_stats():
+    """Hit/miss counters of the shared selection cache."""
+    return _selection.cache_info()._asdict()
+
+
+# --- 5. Incremental Ingestion ---
+data_lock = threading.RLock()
+
+
+def ingest_admissions(df):
+    """Append new admissions and fold them into the cube and indexes in O(batch).
+
+    Cached selections are keyed by store version, so the next dashboard
+    refresh picks up the new rows without recomputing the full history.
+    """
+    with data_lock:
+        checkpoint = store.checkpoint()
+        start = store.append(df)  # raises before changing anything on invalid input
+        try:
+            cube.add_rows(store, start)
+        except BaseException:
+            # Store and cube change together or not at all.
+            store.restore(checkpoint)
+            cube.__init__(store)
+            raise
+    return len(df)
+
+# --- 6. Theme Helper (colors, dropdowns, etc.) ---
 def get_theme(dark):
     kpi_value_light = {
         "color": "#21243d",  # nearly black for light mode
@@ -102,19 +702,43 @@ def get_theme(dark):
             'kpi_value': kpi_value_light,  # <--- THIS IS NEW
         }
 
-def make_summary_table(df):
-    summary = df.groupby(['Diagnosis', 'Outcome']).agg(
-        Count=('PatientID', 'count'),
-        AvgCost=('Cost', 'mean')
-    ).reset_index()
-    return summary
+def theme_styles(dark):
+    """Component styles for one theme, as applied by the clientside callbacks."""
+    t = get_theme(dark)
+    return {
+        'container': {"background": t['bg_color'], "fontFamily": t['font_family'], "paddingBottom": "2rem"},
+        'header': {"color": t['accent_color'], "fontWeight": 900, "fontSize": "2.6rem", "letterSpacing": "0.01em", "marginTop": "2rem", "fontFamily": t['font_family'], "textShadow": "0 1px 0 rgba(0,0,0,0.06)"},
+        'subtitle': {"color": t['header_color'], "marginBottom": "1rem", "fontFamily": t['font_family'], "fontSize": "1.1rem"},
+        'footer': {"textAlign": "center", "marginTop": "2rem", "color": t['header_color'], "letterSpacing": "0.02em", "fontFamily": t['font_family']},
+        'card': {"background": t['card_color'], "marginBottom": "1rem", "boxShadow": "0 2px 12px rgba(0,0,0,0.10)", "borderRadius": "1.5rem", "border": "none"},
+        'kpi_value': t['kpi_value'],
+        'dropdown': t['dropdown'],
+    }
+
+# Computed once and shipped with the layout; theme switches never hit the server.
+THEME_STYLES = {'light': theme_styles(False), 'dark': theme_styles(True)}
+
+TREND_GRANULARITIES = {"D": "Daily", "W": "Weekly", "M": "Monthly"}
+TREND_MAX_POINTS = 365
+
+REFRESH_INTERVAL_MS = 30_000
+INGEST_ROUTE = "/api/admissions"
 
-# --- 3. Dash App Layout ---
+EXPORT_ROUTE = "/download/filtered_healthcare_data.{fmt}"
+EXPORT_FORMATS = {"xlsx": "Excel", "csv": "CSV", "parquet": "Parquet"}
+EXPORT_CHUNK_ROWS = 100_000
+
+# --- 7. Dash App Layout ---
 app = Dash(__name__, external_stylesheets=[dbc.themes.FLATLY, dbc.themes.DARKLY])
 app.title = "Healthcare Cost & Outcome Analytics"
+server = app.server
+instrument(app, "healthcare")
 
 app.layout = html.Div([
     dcc.Store(id='dark-mode', data=False),
+    dcc.Store(id='theme-styles', data=THEME_STYLES),
+    dcc.Store(id='data-version', data=store.version),
+    dcc.Interval(id='refresh-interval', interval=REFRESH_INTERVAL_MS),
     dbc.Container([
         html.Div([
             html.H2("📝 Healthcare Cost & Outcome Analytics", id="main-header", style={"fontWeight": 800, "letterSpacing": "0.02em", "marginTop": "2rem"}),
@@ -169,7 +793,7 @@ app.layout = html.Div([
                     dbc.CardHeader("📚 Diagnosis Group"),
                     dbc.CardBody([
                         dcc.Dropdown(
-                            options=[{"label": d, "value": d} for d in sorted(patients['Diagnosis'].unique())],
+                            options=[{"label": d, "value": d} for d in store.labels('Diagnosis')],
                             value=[], multi=True, id="diag-dropdown",
                             placeholder="Filter by diagnosis..."
                         ),
@@ -181,7 +805,7 @@ app.layout = html.Div([
                     dbc.CardHeader("♀♂ Gender"),
                     dbc.CardBody([
                         dcc.Dropdown(
-                            options=[{"label": g, "value": g} for g in sorted(patients['Gender'].unique())],
+                            options=[{"label": g, "value": g} for g in store.labels('Gender')],
                             value=[], multi=True, id="gender-dropdown",
                             placeholder="Filter by gender..."
                         ),
@@ -194,10 +818,10 @@ app.layout = html.Div([
                     dbc.CardBody([
                         dcc.DatePickerRange(
                             id='date-picker',
-                            min_date_allowed=patients['AdmissionDate'].min(),
-                            max_date_allowed=patients['AdmissionDate'].max(),
-                            start_date=patients['AdmissionDate'].min(),
-                            end_date=patients['AdmissionDate'].max(),
+                            min_date_allowed=store.date_bounds()[0],
+                            max_date_allowed=store.date_bounds()[1],
+                            start_date=store.date_bounds()[0],
+                            end_date=store.date_bounds()[1],
                             display_format='MMM D, YYYY',
                             style={"width": "100%"}
                         )
@@ -235,8 +859,13 @@ app.layout = html.Div([
             ]),
             dbc.Col([
                 dbc.Card([
-                    dbc.CardHeader("Cost Trend Over Time (Monthly Avg)", style={"fontWeight": 600}),
+                    dbc.CardHeader("Cost Trend Over Time (Avg)", style={"fontWeight": 600}),
                     dbc.CardBody([
+                        dcc.RadioItems(
+                            id="trend-granularity",
+                            options=[{"label": label, "value": freq} for freq, label in TREND_GRANULARITIES.items()],
+                            value="M", inline=True, inputStyle={"marginLeft": "1rem", "marginRight": "0.3rem"}
+                        ),
                         dcc.Graph(id="trend-line", config={"displayModeBar": False, "staticPlot": False})
                     ]),
                 ], id="trend-card"),
@@ -244,9 +873,15 @@ app.layout = html.Div([
         ]),
         dbc.Row([
             dbc.Col([
+                dcc.RadioItems(
+                    id="export-format",
+                    options=[{"label": label, "value": fmt} for fmt, label in EXPORT_FORMATS.items()],
+                    value="xlsx", inline=True, inputStyle={"marginLeft": "1rem", "marginRight": "0.3rem"},
+                    style={"display": "inline-block", "marginRight": "1rem"}
+                ),
                 dbc.Button(
-                    ["⬇️ ", "Download Filtered Data (Excel)"], id="download-btn", color="success", className="mt-4"),
-                dcc.Download(id="download-data")
+                    ["⬇️ ", "Download Filtered Data"], id="download-btn", color="success", className="mt-4",
+                    href=EXPORT_ROUTE.format(fmt="xlsx"), external_link=True),
             ], width=12, style={"textAlign": "right"}),
         ]),
         html.Div("✨ Sample portfolio dashboard. Created with Dash, Plotly & Bootstrap.", id="footer", style={"textAlign": "center", "marginTop": "2rem", "letterSpacing": "0.02em"}),
@@ -254,18 +889,19 @@ app.layout = html.Div([
 ])
 
 
-# --- 4. Callbacks ---
-@app.callback(
+# --- 8. Callbacks ---
+# Theme styling runs in the browser (assets/healthcare_theme.js) from the
+# precomputed THEME_STYLES store.
+app.clientside_callback(
+    ClientsideFunction(namespace='healthcare', function_name='toggleDarkMode'),
     Output('dark-mode', 'data'),
     [Input('dark-toggle', 'n_clicks')],
-    [State('dark-mode', 'data')]
+    [State('dark-mode', 'data')],
+    prevent_initial_call=True
 )
-def toggle_dark_mode(n, current):
-    if n is None:
-        return False
-    return not current
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='healthcare', function_name='setTheme'),
     [Output("main-container", "style"),
      Output("main-header", "style"),
      Output("subtitle", "style"),
@@ -281,166 +917,365 @@ def toggle_dark_mode(n, current):
      Output("kpi-card2", "style"),
      Output("kpi-card3", "style"),
      Output("kpi-card4", "style")],
-    [Input('dark-mode', 'data')]
+    [Input('dark-mode', 'data')],
+    [State('theme-styles', 'data')]
 )
-def set_theme(dark):
-    t = get_theme(dark)
-    card_style = {"background": t['card_color'], "marginBottom": "1rem", "boxShadow": "0 2px 12px rgba(0,0,0,0.10)", "borderRadius": "1.5rem", "border": "none"}
-    header_style = {"color": t['accent_color'], "fontWeight": 900, "fontSize": "2.6rem", "letterSpacing": "0.01em", "marginTop": "2rem", "fontFamily": t['font_family'], "textShadow": "0 1px 0 rgba(0,0,0,0.06)"}
-    subtitle_style = {"color": t['header_color'], "marginBottom": "1rem", "fontFamily": t['font_family'], "fontSize": "1.1rem"}
-    footer_style = {"textAlign": "center", "marginTop": "2rem", "color": t['header_color'], "letterSpacing": "0.02em", "fontFamily": t['font_family']}
-    return [
-        {"background": t['bg_color'], "fontFamily": t['font_family'], "paddingBottom": "2rem"},
-        header_style,
-        subtitle_style,
-        footer_style,
-        card_style, card_style, card_style, card_style, card_style, card_style, card_style, card_style, card_style, card_style, card_style
-    ]
-
-# NEW: KPI Value Styling Callback
-@app.callback(
+
+app.clientside_callback(
+    ClientsideFunction(namespace='healthcare', function_name='styleKpiValues'),
     [Output("kpi-avg-cost", "style"),
      Output("kpi-recovery", "style"),
      Output("kpi-readmit", "style"),
      Output("kpi-total", "style")],
-    [Input('dark-mode', 'data')]
+    [Input('dark-mode', 'data')],
+    [State('theme-styles', 'data')]
 )
-def style_kpi_values(dark):
-    t = get_theme(dark)
-    return t['kpi_value'], t['kpi_value'], t['kpi_value'], t['kpi_value']
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='healthcare', function_name='styleDropdowns'),
     [Output("diag-dropdown", "style"),
      Output("gender-dropdown", "style")],
-    [Input('dark-mode', 'data')]
+    [Input('dark-mode', 'data')],
+    [State('theme-styles', 'data')]
 )
-def style_dropdowns(dark):
+
+
+FIGURE_IDS = ("avg-cost-chart", "outcome-pie", "summary-table", "trend-line")
+
+
+def figure_colors(dark):
+    """The only figure properties that differ between light and dark mode."""
     t = get_theme(dark)
-    return t['dropdown'], t['dropdown']
+    return {
+        'background': t['card_color'],
+        'font': "#f5f5f5" if dark else "#263238",
+        'grid': "#23272e" if dark else "#e0e7ef",
+        'pie_line': "#23272e" if dark else "#fff",
+        'accent': t['accent_color'],
+    }
 
 
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of at most n_out points that keep the line's shape."""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nx, ny = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            nx, ny = x[-1], y[-1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
 
-@app.callback(
-    [Output("avg-cost-chart", "figure"),
-     Output("outcome-pie", "figure"),
-     Output("summary-table", "figure"),
-     Output("trend-line", "figure"),
-     Output("kpi-avg-cost", "children"),
-     Output("kpi-recovery", "children"),
-     Output("kpi-readmit", "children"),
-     Output("kpi-total", "children")],
-    [Input("diag-dropdown", "value"),
-     Input("gender-dropdown", "value"),
-     Input("date-picker", "start_date"),
-     Input("date-picker", "end_date"),
-     Input('dark-mode', 'data')]
-)
-def update_dashboard(diag_sel, gender_sel, start_date, end_date, dark):
+
+def build_figures(agg, dark, granularity="M"):
+    """Build the four dashboard figures from pre-aggregated tables.
+
+    Figure size depends only on the number of categories and trend points
+    (capped at TREND_MAX_POINTS), never on the number of patients.
+    """
     t = get_theme(dark)
-    df = patients.copy()
-    if diag_sel:
-        df = df[df['Diagnosis'].isin(diag_sel)]
-    if gender_sel:
-        df = df[df['Gender'].isin(gender_sel)]
-    df = df[(df['AdmissionDate'] >= pd.to_datetime(start_date)) & (df['AdmissionDate'] <= pd.to_datetime(end_date))]
+    c = figure_colors(dark)
     # Animations: animate on data change
     transition = {'duration': 700, 'easing': 'cubic-in-out'}
     # --- Avg Cost ---
-    avg_cost = df.groupby(['Diagnosis', 'Gender'])['Cost'].mean().reset_index()
     avg_cost_fig = px.bar(
-        avg_cost, x='Diagnosis', y='Cost', color='Gender', barmode='group',
+        agg['avg_cost'], x='Diagnosis', y='Cost', color='Gender', barmode='group',
         labels={"Cost": "Avg Cost ($)"},
         color_discrete_sequence=t['theme_colors'],
     )
     avg_cost_fig.update_layout(
-        plot_bgcolor=t['card_color'], paper_bgcolor=t['card_color'],
-        font=dict(family=t['font_family'], size=15, color="#f5f5f5" if dark else "#263238"),
+        plot_bgcolor=c['background'], paper_bgcolor=c['background'],
+        font=dict(family=t['font_family'], size=15, color=c['font']),
         showlegend=True, legend=dict(orientation="h", y=-0.2),
         margin=dict(l=24, r=24, t=28, b=12),
         xaxis=dict(title=None),
-        yaxis=dict(gridcolor="#23272e" if dark else "#e0e7ef"),
+        yaxis=dict(gridcolor=c['grid']),
         transition=transition
     )
     # Pie chart
+    outcomes = agg['outcomes']
     outcome_fig = px.pie(
-        df, names='Outcome', hole=0.47,
+        outcomes, names='Outcome', values='Count', hole=0.47,
         color_discrete_sequence=t['theme_colors'],
     )
     outcome_fig.update_traces(
         textinfo='percent+label',
-        pull=[0.08 if o=="Deceased" else 0 for o in df['Outcome'].unique()],
-        marker=dict(line=dict(color="#23272e" if dark else "#fff", width=2)),
+        pull=[0.08 if o=="Deceased" else 0 for o in outcomes['Outcome']],
+        marker=dict(line=dict(color=c['pie_line'], width=2)),
     )
     outcome_fig.update_layout(
-        plot_bgcolor=t['card_color'], paper_bgcolor=t['card_color'],
-        font=dict(family=t['font_family'], size=15, color="#f5f5f5" if dark else "#263238"),
+        plot_bgcolor=c['background'], paper_bgcolor=c['background'],
+        font=dict(family=t['font_family'], size=15, color=c['font']),
         margin=dict(l=24, r=24, t=24, b=12),
         showlegend=False,
         transition=transition
     )
     # Bubble Table
-    summary = make_summary_table(df)
     summary_fig = px.scatter(
-        summary, x="Diagnosis", y="AvgCost", size="Count", color="Outcome",
+        agg['summary'], x="Diagnosis", y="AvgCost", size="Count", color="Outcome",
         color_discrete_sequence=t['theme_colors'], hover_data=["Count"],
     )
     summary_fig.update_layout(
-        plot_bgcolor=t['card_color'], paper_bgcolor=t['card_color'],
-        font=dict(family=t['font_family'], size=14, color="#f5f5f5" if dark else "#263238"),
+        plot_bgcolor=c['background'], paper_bgcolor=c['background'],
+        font=dict(family=t['font_family'], size=14, color=c['font']),
         legend=dict(title="Outcome", orientation="h", y=-0.2),
         xaxis=dict(title=None),
-        yaxis=dict(title="Avg Cost ($)", gridcolor="#23272e" if dark else "#e0e7ef"),
+        yaxis=dict(title="Avg Cost ($)", gridcolor=c['grid']),
         margin=dict(l=12, r=16, t=16, b=18),
         transition=transition
     )
-    # Trend line (Monthly avg)
-    if len(df):
-        df['Month'] = df['AdmissionDate'].dt.to_period("M").dt.to_timestamp()
-        monthly = df.groupby("Month")["Cost"].mean().reset_index()
+    # Trend line (avg per day/week/month); the line takes its color from the
+    # layout colorway so a theme switch only has to patch the layout.
+    if agg['total']:
+        trend = agg['trend'][granularity]
+        if len(trend) > TREND_MAX_POINTS:
+            trend = trend.iloc[lttb(trend['Period'].to_numpy().astype(np.int64), trend['Cost'], TREND_MAX_POINTS)]
         trend_fig = px.line(
-            monthly, x="Month", y="Cost",
-            labels={"Cost": "Avg Cost ($)", "Month": "Month"},
-            color_discrete_sequence=[t['accent_color']],
+            trend, x="Period", y="Cost",
+            labels={"Cost": "Avg Cost ($)", "Period": {"D": "Day", "W": "Week", "M": "Month"}[granularity]},
             markers=True
         )
+        trend_fig.update_traces(line_color=None)
         trend_fig.update_layout(
-            plot_bgcolor=t['card_color'], paper_bgcolor=t['card_color'],
-            font=dict(family=t['font_family'], size=15, color="#f5f5f5" if dark else "#263238"),
+            plot_bgcolor=c['background'], paper_bgcolor=c['background'],
+            font=dict(family=t['font_family'], size=15, color=c['font']),
             margin=dict(l=22, r=22, t=28, b=12),
-            yaxis=dict(gridcolor="#23272e" if dark else "#e0e7ef"),
+            yaxis=dict(gridcolor=c['grid']),
+            colorway=[c['accent']],
             transition=transition
         )
     else:
         trend_fig = px.line(title="No data for current filters")
+    return avg_cost_fig, outcome_fig, summary_fig, trend_fig
+
+
+@app.callback(
+    [Output(fig_id, "figure") for fig_id in FIGURE_IDS] +
+    [Output("kpi-avg-cost", "children"),
+     Output("kpi-recovery", "children"),
+     Output("kpi-readmit", "children"),
+     Output("kpi-total", "children")],
+    [Input("diag-dropdown", "value"),
+     Input("gender-dropdown", "value"),
+     Input("date-picker", "start_date"),
+     Input("date-picker", "end_date"),
+     Input("trend-granularity", "value"),
+     Input("data-version", "data")],
+    [State('dark-mode', 'data')]
+)
+def update_dashboard(diag_sel, gender_sel, start_date, end_date, granularity, version, dark):
+    with stage("filter") as s:
+        agg = get_selection(diag_sel, gender_sel, start_date, end_date).aggregates
+        s.rows = agg['total']
+    with stage("figures"):
+        figures = build_figures(agg, dark, granularity or "M")
     # --- KPIs ---
-    avg_cost_val = f"${df['Cost'].mean():,.0f}" if len(df) else "N/A"
-    total = f"{len(df):,}" if len(df) else "0"
-    recov = f"{100*df['Outcome'].value_counts(normalize=True).get('Recovered',0):.1f}" if len(df) else "0.0"
-    readm = f"{100*df['Outcome'].value_counts(normalize=True).get('Readmitted',0):.1f}" if len(df) else "0.0"
-    return avg_cost_fig, outcome_fig, summary_fig, trend_fig, avg_cost_val, recov, readm, total
+    total = agg['total']
+    avg_cost_val = f"${agg['avg_cost_val']:,.0f}" if total else "N/A"
+    recov = f"{100*agg['recovered']:.1f}"
+    readm = f"{100*agg['readmitted']:.1f}"
+    total = f"{total:,}"
+    return (*figures, avg_cost_val, recov, readm, total)
+
 
 @app.callback(
-    Output("download-data", "data"),
-    [Input("download-btn", "n_clicks")],
-    [State("diag-dropdown", "value"),
-     State("gender-dropdown", "value"),
-     State("date-picker", "start_date"),
-     State("date-picker", "end_date")]
+    [Output("data-version", "data"),
+     Output("diag-dropdown", "options"),
+     Output("gender-dropdown", "options"),
+     Output("date-picker", "max_date_allowed"),
+     Output("date-picker", "end_date")],
+    [Input("refresh-interval", "n_intervals")],
+    [State("data-version", "data"),
+     State("date-picker", "end_date"),
+     State("date-picker", "max_date_allowed")],
+    prevent_initial_call=True
+)
+def poll_new_admissions(n, seen_version, end_date, max_allowed):
+    """Bump the client's data version when admissions were ingested since the last poll."""
+    if store.version == seen_version:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    latest = store.date_bounds()[1]
+    # Keep following new admissions when the range was open to the latest date.
+    follow = end_date is None or max_allowed is None or pd.Timestamp(end_date) >= pd.Timestamp(max_allowed)
+    return (
+        store.version,
+        [{"label": d, "value": d} for d in store.labels('Diagnosis')],
+        [{"label": g, "value": g} for g in store.labels('Gender')],
+        latest,
+        latest if follow else dash.no_update,
+    )
+
+
+# Theme switches only restyle the figures already in the browser: no
+# aggregation, no figure rebuild, constant cost whatever the dataset size.
+@app.callback(
+    [Output(fig_id, "figure", allow_duplicate=True) for fig_id in FIGURE_IDS],
+    [Input('dark-mode', 'data')],
+    prevent_initial_call=True
+)
+def restyle_figures(dark):
+    c = figure_colors(dark)
+    patches = []
+    for _ in FIGURE_IDS:
+        patch = Patch()
+        patch['layout']['plot_bgcolor'] = c['background']
+        patch['layout']['paper_bgcolor'] = c['background']
+        patch['layout']['font']['color'] = c['font']
+        patches.append(patch)
+    avg_cost_patch, outcome_patch, summary_patch, trend_patch = patches
+    for patch in (avg_cost_patch, summary_patch, trend_patch):
+        patch['layout']['yaxis']['gridcolor'] = c['grid']
+    outcome_patch['data'][0]['marker']['line']['color'] = c['pie_line']
+    trend_patch['layout']['colorway'] = [c['accent']]
+    return patches
+
+@app.callback(
+    Output("download-btn", "href"),
+    [Input("diag-dropdown", "value"),
+     Input("gender-dropdown", "value"),
+     Input("date-picker", "start_date"),
+     Input("date-picker", "end_date"),
+     Input("export-format", "value")]
 )
-def download_filtered_data(n, diag_sel, gender_sel, start_date, end_date):
-    if not n:
-        return dash.no_update
-    df = patients.copy()
-    if diag_sel:
-        df = df[df['Diagnosis'].isin(diag_sel)]
-    if gender_sel:
-        df = df[df['Gender'].isin(gender_sel)]
-
-    df = df[(df['AdmissionDate'] >= pd.to_datetime(start_date)) & (df['AdmissionDate'] <= pd.to_datetime(end_date))]
-    output = BytesIO()
-    df.to_excel(output, index=False)
-    data = base64.b64encode(output.getvalue()).decode()
-    return dict(content=data, filename="filtered_healthcare_data.xlsx", base64=True)
+def update_export_link(diag_sel, gender_sel, start_date, end_date, fmt):
+    params = [("diag", d) for d in diag_sel or []] + [("gender", g) for g in gender_sel or []]
+    params += [(k, v) for k, v in (("start", start_date), ("end", end_date)) if v]
+    return EXPORT_ROUTE.format(fmt=fmt) + ("?" + urlencode(params) if params else "")
+
+
+# --- 9. Streaming Export ---
+def _export_chunks(patients, rows):
+    # Row indices are built per chunk from the RowSet, so memory does not
+    # grow with the number of rows exported.  An empty export is one empty frame.
+    chunks = rows.chunks(EXPORT_CHUNK_ROWS)
+    yield patients.to_frame(next(chunks, slice(0, 0)))
+    for chunk in chunks:
+        yield patients.to_frame(chunk)
+
+
+def _stream_csv(patients, rows):
+    for i, chunk in enumerate(_export_chunks(patients, rows)):
+        yield chunk.to_csv(index=False, header=(i == 0))
+
+
+class _DrainableSink:
+    """Write-only file object whose buffered bytes can be handed out and dropped."""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _stream_parquet(patients, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    sink = _DrainableSink()
+    writer = None
+    for chunk in _export_chunks(patients, rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _stream_xlsx(patients, rows):
+    # Write-only workbooks stream rows to disk; the finished file is then sent
+    # in fixed-size blocks, so memory stays flat whatever the row count.
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    header_written = False
+    for chunk in _export_chunks(patients, rows):
+        if not header_written:
+            ws.append(list(chunk.columns))
+            header_written = True
+        for record in chunk.itertuples(index=False, name=None):
+            ws.append(record)
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while block := tmp.read(1 << 20):
+            yield block
+
+
+# format -> (writer, mimetype, optional module the writer imports)
+EXPORT_WRITERS = {
+    "csv": (_stream_csv, "text/csv", None),
+    "parquet": (_stream_parquet, "application/vnd.apache.parquet", "pyarrow"),
+    "xlsx": (_stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", None),
+}
+
+
+@app.server.route(EXPORT_ROUTE.format(fmt="<fmt>"))
+def download_filtered_data(fmt):
+    if fmt not in EXPORT_WRITERS:
+        abort(404)
+    writer, mimetype, requires = EXPORT_WRITERS[fmt]
+    # Fail before streaming starts: an import error inside the writer would cut the file off.
+    if requires and importlib.util.find_spec(requires) is None:
+        abort(501, description=f"{fmt} export needs the {requires} package on the server")
+    args = request.args
+    with stage("filter") as s:
+        # Rows and the store snapshot they index come from the same store
+        # version: the response streams after this returns, while ingestion
+        # may append (or re-sort) the live store.
+        with data_lock:
+            selection = get_selection(args.getlist("diag"), args.getlist("gender"), args.get("start"), args.get("end"))
+            rows, patients = selection.matches, store.snapshot()
+        s.rows = len(rows)
+    return Response(
+        stream_with_context(writer(patients, rows)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=filtered_healthcare_data.{fmt}"},
+    )
+
+
+@app.server.route(INGEST_ROUTE, methods=["POST"])
+def ingest_admissions_route():
+    """POST a JSON list of admission records; requires HEALTHCARE_INGEST_TOKEN."""
+    token = os.environ.get("HEALTHCARE_INGEST_TOKEN")
+    if not token or request.headers.get("Authorization") != f"Bearer {token}":
+        abort(403)
+    if request.environ.get("wsgi.multiprocess"):
+        # Appends live in this process only; other workers would keep serving
+        # their own store versions and clients would flip between datasets.
+        abort(409, description="Ingestion needs a single worker process (e.g. gunicorn --workers 1 --threads N)")
+    payload = request.get_json(silent=True)
+    records = payload.get("records") if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        abort(400, description="Expected a JSON list of admission records")
+    try:
+        appended = ingest_admissions(pd.DataFrame.from_records(records))
+    except ValueError as e:
+        abort(400, description=str(e))
+    return {"appended": appended, "version": store.version, "total": len(store)}
 
 
 if __name__ == "__main__":
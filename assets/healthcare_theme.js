@@ -0,0 +1,22 @@
+// Clientside theme callbacks for the Healthcare dashboard.
+// Styles come precomputed from the 'theme-styles' store (THEME_STYLES in the app).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    healthcare: {
+        toggleDarkMode: function (n, current) {
+            if (!n) {
+                return false;
+            }
+            return !current;
+        },
+        setTheme: function (dark, styles) {
+            const t = styles[dark ? 'dark' : 'light'];
+            return [t.container, t.header, t.subtitle, t.footer].concat(Array(11).fill(t.card));
+        },
+        styleKpiValues: function (dark, styles) {
+            return Array(4).fill(styles[dark ? 'dark' : 'light'].kpi_value);
+        },
+        styleDropdowns: function (dark, styles) {
+            return Array(2).fill(styles[dark ? 'dark' : 'light'].dropdown);
+        }
+    }
+});
@@ -0,0 +1,23 @@
+// Clientside figure loaders for Digital Skills Pulse.
+// Figures come prebuilt from the app's JSON routes; every fetch revalidates
+// with If-None-Match, so unchanged figures are answered with a 304.
+async function fetchJson(url) {
+    const response = await fetch(url, {cache: 'no-cache'});
+    if (!response.ok) {
+        throw new Error(url + ' request failed: ' + response.status);
+    }
+    return response.json();
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    skills_pulse: {
+        loadOverview: async function (source) {
+            const overview = await fetchJson(source.url);
+            return source.domains.map(d => overview[d].figure)
+                .concat(source.domains.map(d => overview[d].kpi));
+        },
+        loadFigure: async function (url) {
+            return fetchJson(url);
+        }
+    }
+});
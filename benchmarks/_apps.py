@@ -0,0 +1,30 @@
+"""Import the Dash app scripts (whose file names contain spaces) as modules."""
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILES = {
+    "healthcare": "HealthCare Cost & Outcome Analytics (Synthetic).py",
+    "skills_pulse": "Digital Skills Pulse.py",
+}
+
+
+def load_app(name):
+    """Load one of the app scripts by short name; cached in sys.modules."""
+    mod_name = f"{name}_app"
+    if mod_name in sys.modules:
+        return sys.modules[mod_name]
+    # The apps use paths relative to the repository root.
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location(mod_name, os.path.join(ROOT, APP_FILES[name]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[mod_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[mod_name]
+        raise
+    return module
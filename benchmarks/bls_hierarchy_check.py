@@ -0,0 +1,48 @@
+"""
+Check that every Skills Pulse drill-down only lists occupations of its group.
+
+Builds the OEWS occupation hierarchy from the bundled BLS workbook and, for
+every level and every group above it, checks that each listed occupation's
+SOC code starts with the group's prefix (major 15-, minor 15-1, broad 15-125).
+Exits non-zero on any occupation filed under the wrong group.
+
+Usage:
+    python benchmarks/bls_hierarchy_check.py
+"""
+import argparse
+import sys
+
+from _apps import load_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    dsp = load_app('skills_pulse')
+    dsp._warm_started = True
+    hierarchy = dsp.bls_data.get()["bls_hierarchy"]
+    levels = list(dsp.BLS_LEVELS)
+    failures = 0
+    for d, level in enumerate(levels):
+        for above in levels[:d]:
+            prefix_len = dsp.BLS_GROUP_PREFIX[above]
+            above_codes = set(hierarchy.levels[above]["OCC_CODE"])
+            groups = [code for code in hierarchy.groups[level] if code in above_codes]
+            listed = 0
+            for group in groups:
+                rows = hierarchy.top(level, dsp.BLS_SORT_KEYS[0], None, group)["OCC_CODE"]
+                listed += len(rows)
+                wrong = [code for code in rows if code[:prefix_len] != group[:prefix_len]]
+                if wrong:
+                    print(f"FAIL  {level} in {above} {group}: {', '.join(wrong)}")
+                    failures += 1
+            print(f"{level:<9} by {above:<6} {len(groups):>4} groups {listed:>5} rows")
+    if failures:
+        print(f"FAIL: {failures} group(s) list occupations from another group")
+        sys.exit(1)
+    print("OK: every drill-down lists only its own group's occupations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Latency of the US Jobs salary boxplot in each rendering mode.
+
+  - pyplot:       the original per-request seaborn/pyplot PNG (reference);
+  - image-render: the object-oriented Agg PNG, rendered on a cache miss;
+  - image-cached: the same image served from the cache (the normal case,
+                  as the warm-up thread pre-renders every dropdown value);
+  - plotly:       the native Plotly box figure, built and serialized.
+
+Usage:
+    python benchmarks/boxplot_modes.py --repeat 5
+"""
+import argparse
+import base64
+import time
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from plotly.io.json import to_json_plotly
+
+from _apps import load_app
+
+
+def pyplot_img(sorted_bls):
+    """The pre-refactor renderer, kept here as the baseline."""
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.boxplot(data=sorted_bls, y="OCC_TITLE", x="A_MEDIAN", ax=ax, color='#2563eb')
+    ax.set_title("Salary Distribution by Occupation Group", fontsize=18, pad=18)
+    ax.set_xlabel("Median Salary ($)", fontsize=15)
+    ax.set_ylabel("")
+    ax.tick_params(axis="y", labelsize=13)
+    ax.tick_params(axis="x", labelsize=13)
+    plt.tight_layout()
+    buf = BytesIO()
+    plt.savefig(buf, format="png", bbox_inches='tight')
+    plt.close(fig)
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    dsp = load_app('skills_pulse')
+    # Detailed occupations, so every N in the dropdown is a full set of rows.
+    level = 'detailed'
+    print(f"{'mode':<14} {'sort key':<10} {'N':>4} {'p50 ms':>9} {'payload B':>11}")
+    for sort_by in dsp.BLS_SORT_KEYS:
+        for top_n in dsp.BLS_TOP_N_OPTIONS:
+            sorted_bls = dsp.top_bls(sort_by, top_n, level)
+
+            def image_render():
+                dsp._boxplot_cache.pop((level, None, sort_by, len(sorted_bls)), None)
+                return dsp.cached_boxplot_img(sort_by, top_n, level)
+
+            modes = {
+                'pyplot': lambda: pyplot_img(sorted_bls),
+                'image-render': image_render,
+                'image-cached': lambda: dsp.cached_boxplot_img(sort_by, top_n, level),
+                'plotly': lambda: to_json_plotly(dsp.boxplot_figure(sorted_bls)),
+            }
+            for mode, fn in modes.items():
+                times = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    payload = fn()
+                    times.append(time.perf_counter() - t0)
+                print(f"{mode:<14} {sort_by:<10} {top_n:>4} {np.median(times) * 1000:>9.2f} {len(payload):>11,}")
+
+
+if __name__ == '__main__':
+    main()
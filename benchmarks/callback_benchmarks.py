@@ -0,0 +1,172 @@
+"""
+Callback benchmark suite for the Healthcare and Digital Skills Pulse apps.
+
+Times each callback over a matrix of dataset sizes (Healthcare) and filter
+selectivities, and records p50/p95 latency, peak traced memory (tracemalloc)
+and serialized payload bytes.  Results can be saved as a baseline and later
+runs compared against it; a regression beyond the tolerance exits non-zero.
+
+Usage:
+    python benchmarks/callback_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/callback_benchmarks.py --compare benchmarks/baseline.json --tolerance 0.25
+    python benchmarks/callback_benchmarks.py --sizes 5000 1000000 --repeat 30
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from _apps import load_app
+
+HEALTHCARE_FILTERS = {
+    'all': ([], [], None, None),
+    'one-diagnosis': (['Cardio'], [], None, None),
+    'narrow': (['Cardio'], ['Female'], '2023-03-01', '2023-03-31'),
+}
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn `repeat` times; return latency percentiles, peak memory and payload size."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    if setup:
+        setup()
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    payload = result if isinstance(result, int) else len(to_json_plotly(result))
+    return {
+        'p50_ms': float(np.percentile(times, 50) * 1000),
+        'p95_ms': float(np.percentile(times, 95) * 1000),
+        'peak_kib': peak / 1024,
+        'payload_bytes': payload,
+    }
+
+
+def healthcare_cases(sizes):
+    hc = load_app('healthcare')
+    client = hc.app.server.test_client()
+    for n in sizes:
+        store = hc.PatientStore.from_frame(hc.synthetic_patients(n))
+        cube = hc.FilterCube(store)
+
+        def use_dataset(store=store, cube=cube):
+            # Swap the dataset in and drop cached selections, so every call is cold.
+            hc.store, hc.cube = store, cube
+            hc._selection.cache_clear()
+
+        for label, (diag, gender, start, end) in HEALTHCARE_FILTERS.items():
+            def dashboard(diag=diag, gender=gender, start=start, end=end):
+                return hc.update_dashboard(diag, gender, start, end, 'M', hc.store.version, False)
+
+            def export(diag=diag, gender=gender, start=start, end=end):
+                href = hc.update_export_link(diag, gender, start, end, 'csv')
+                return len(client.get(href).data)
+
+            yield f"healthcare/update_dashboard/{n}/{label}", dashboard, use_dataset
+            yield f"healthcare/download_filtered_data/{n}/{label}", export, use_dataset
+
+
+def skills_pulse_cases():
+    dsp = load_app('skills_pulse')
+    # The first request through the test client would start the background
+    # warm-up (dataset loads, boxplot pre-rendering) while callbacks are timed.
+    dsp._warm_started = True
+    # Domains whose data files are missing are skipped; their pages only show an alert.
+    for dataset in dsp.DATASETS.values():
+        try:
+            dataset.get()
+        except dsp.DatasetUnavailable as e:
+            print(f"Skipping Digital Skills Pulse {dataset.name} benchmarks: {e}")
+    if dsp.bls_data.available():
+        for sort_by, top_n, level, within in (('TOT_EMP', 15, 'major', None), ('A_MEDIAN', 15, 'major', None),
+                                              ('TOT_EMP', 100, 'detailed', None),
+                                              ('A_MEDIAN', 50, 'detailed', '15-0000')):
+            label = f"{level}/{within}" if within else level
+            yield (f"skills_pulse/update_bls_section/{label}/{sort_by}/{top_n}",
+                   lambda s=sort_by, n=top_n, lv=level, w=within: dsp.update_bls_section(s, n, lv, w), None)
+        yield ("skills_pulse/update_bls_within_options/detailed",
+               lambda: dsp.update_bls_within_options('detailed'), None)
+    if dsp.itu_data.available():
+        for top_n in (10, 50):
+            yield f"skills_pulse/update_itu_section/{top_n}", lambda n=top_n: dsp.update_itu_section(n), None
+    if dsp.onet_data.available():
+        for top_n, query in ((10, dsp.DEFAULT_ONET_QUERY), (30, dsp.DEFAULT_ONET_QUERY), (10, 'python OR sql')):
+            label = 'default' if query == dsp.DEFAULT_ONET_QUERY else query.replace(' ', '-')
+            yield (f"skills_pulse/update_onet_section/{top_n}/{label}",
+                   lambda n=top_n, q=query: dsp.update_onet_section(n, q), None)
+    if dsp.onet_data.available():
+        yield ("skills_pulse/update_occupation_profile",
+               lambda: dsp.update_occupation_profile(dsp.DEFAULT_OCCUPATION), None)
+    if dsp.crosswalk_data.available():
+        for metric, top_n in (('WEIGHTED_HOT_DEMAND', 15), ('A_MEDIAN', 100)):
+            yield (f"skills_pulse/update_digital_demand/{metric}/{top_n}",
+                   lambda m=metric, n=top_n: dsp.update_digital_demand(m, n), None)
+    client = dsp.app.server.test_client()
+    etag = client.get(dsp.OVERVIEW_ROUTE).headers['ETag']
+    yield "skills_pulse/overview_json", lambda: len(client.get(dsp.OVERVIEW_ROUTE).data), None
+    yield ("skills_pulse/overview_json/not-modified",
+           lambda: len(client.get(dsp.OVERVIEW_ROUTE, headers={'If-None-Match': etag}).data), None)
+    if dsp.itu_data.available():
+        yield "skills_pulse/itu_map_json", lambda: len(client.get(dsp.ITU_MAP_ROUTE).data), None
+    for path in ('/', '/us-jobs', '/global-skills', '/onet', dsp.OCCUPATION_PATH, dsp.DIGITAL_DEMAND_PATH):
+        yield f"skills_pulse/render_page{path}", lambda p=path: dsp.render_page(p), None
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before and current['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--skip-skills-pulse', action='store_true')
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs baseline')
+    args = parser.parse_args()
+
+    cases = list(healthcare_cases(args.sizes))
+    if not args.skip_skills_pulse:
+        try:
+            cases += list(skills_pulse_cases())
+        except (OSError, ImportError) as e:
+            print(f"Skipping Digital Skills Pulse benchmarks: {e}")
+
+    results = {}
+    print(f"{'benchmark':<60} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>10} {'payload B':>11}")
+    for name, fn, setup in cases:
+        r = results[name] = measure(fn, args.repeat, setup)
+        print(f"{name:<60} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['peak_kib']:>10,.0f} {r['payload_bytes']:>11,}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of baseline p50")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Check that the Healthcare filter cube matches the pandas path it replaced.
+
+For a few filter selections, compares FilterCube.aggregate() (KPIs, the
+Diagnosis x Gender and Diagnosis x Outcome tables, outcome counts and every
+trend granularity) and PatientStore.select() (the exported rows) with a
+plain pandas filter + groupby over the same patients.  Exits non-zero on
+any mismatch.
+
+Usage:
+    python benchmarks/cube_equivalence.py --sizes 5000 200000
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _apps import load_app
+
+SELECTIONS = {
+    'all': ([], [], None, None),
+    'one-diagnosis': (['Cardio'], [], None, None),
+    'multi': (['Cardio', 'Neuro'], ['Female', 'Other'], '2022-06-15', '2023-02-10'),
+    'narrow': (['Cardio'], ['Female'], '2023-03-01', '2023-03-31'),
+    'empty': (['Ortho'], [], '2030-01-01', '2030-12-31'),
+}
+TREND_FREQS = ('D', 'W', 'M')
+
+
+def pandas_filter(df, diag_sel, gender_sel, start_date, end_date):
+    if diag_sel:
+        df = df[df['Diagnosis'].isin(diag_sel)]
+    if gender_sel:
+        df = df[df['Gender'].isin(gender_sel)]
+    if start_date is not None:
+        df = df[df['AdmissionDate'] >= pd.to_datetime(start_date)]
+    if end_date is not None:
+        df = df[df['AdmissionDate'] <= pd.to_datetime(end_date)]
+    return df
+
+
+def pandas_aggregate(df):
+    """The tables and KPIs as the original callback computed them."""
+    total = len(df)
+    outcomes = df['Outcome'].value_counts()
+    trend = {}
+    for freq in TREND_FREQS:
+        period = df['AdmissionDate'].dt.to_period(freq).dt.to_timestamp()
+        trend[freq] = df.groupby(period)['Cost'].mean().rename_axis('Period').reset_index()
+    return {
+        'avg_cost': df.groupby(['Diagnosis', 'Gender'])['Cost'].mean().reset_index(),
+        'summary': df.groupby(['Diagnosis', 'Outcome']).agg(
+            Count=('PatientID', 'count'), AvgCost=('Cost', 'mean')).reset_index(),
+        'outcomes': outcomes.rename_axis('Outcome').reset_index(name='Count'),
+        'trend': trend,
+        'total': total,
+        'avg_cost_val': df['Cost'].mean() if total else None,
+        'recovered': outcomes.get('Recovered', 0) / total if total else 0.0,
+        'readmitted': outcomes.get('Readmitted', 0) / total if total else 0.0,
+    }
+
+
+def same_table(name, got, want, keys):
+    got = got.sort_values(keys).reset_index(drop=True)
+    want = want.sort_values(keys).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(got, want[got.columns], check_dtype=False, check_exact=False, rtol=1e-6)
+    except AssertionError as e:
+        return [f"{name}: {e}"]
+    return []
+
+
+def compare(got, want):
+    problems = []
+    problems += same_table('avg_cost', got['avg_cost'], want['avg_cost'], ['Diagnosis', 'Gender'])
+    problems += same_table('summary', got['summary'], want['summary'], ['Diagnosis', 'Outcome'])
+    problems += same_table('outcomes', got['outcomes'], want['outcomes'], ['Outcome'])
+    for freq in TREND_FREQS:
+        problems += same_table(f'trend[{freq}]', got['trend'][freq], want['trend'][freq], ['Period'])
+    if got['total'] != want['total']:
+        problems.append(f"total: {got['total']} != {want['total']}")
+    for kpi in ('avg_cost_val', 'recovered', 'readmitted'):
+        a, b = got[kpi], want[kpi]
+        if (a is None) != (b is None) or (a is not None and not np.isclose(a, b, rtol=1e-6)):
+            problems.append(f"{kpi}: {a} != {b}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 200_000])
+    args = parser.parse_args()
+
+    app = load_app('healthcare')
+    failures = 0
+    for n in args.sizes:
+        store = app.PatientStore.from_frame(app.synthetic_patients(n))
+        cube = app.FilterCube(store)
+        # Compare against the store's own rows, so float32 costs are the same on both sides.
+        patients = store.to_frame()
+        for label, selection in SELECTIONS.items():
+            df = pandas_filter(patients, *selection)
+            problems = compare(cube.aggregate(*selection), pandas_aggregate(df))
+            rows = np.arange(len(store))[store.select(*selection)]
+            if not np.array_equal(rows, df.index.to_numpy()):
+                problems.append(f"select: {len(rows)} rows != {len(df)} pandas rows")
+            status = "OK" if not problems else "FAIL"
+            print(f"{status:<5} {n:>9,} rows  {label:<14} {len(df):>9,} matching")
+            for problem in problems:
+                print(f"      {problem}")
+            failures += bool(problems)
+    if failures:
+        print(f"FAIL: {failures} selection(s) differ from pandas")
+        sys.exit(1)
+    print("OK: cube and store selections match pandas")
+
+
+if __name__ == '__main__':
+    main()
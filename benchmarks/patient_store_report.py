@@ -0,0 +1,80 @@
+"""
+Memory and filter-latency report: legacy object-string patient frame vs PatientStore.
+
+Usage:
+    python benchmarks/patient_store_report.py              # 5k, 1M and 10M rows
+    python benchmarks/patient_store_report.py --sizes 5000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from _apps import load_app
+
+
+def legacy_frame(n, seed=42):
+    """Same distributions as the app generator, in the original object-string layout."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2022-01-01', '2023-12-31')
+    return pd.DataFrame({
+        'PatientID': np.arange(1, n + 1),
+        'AdmissionDate': days[rng.integers(0, len(days), n)],
+        'Gender': rng.choice(['Male', 'Female', 'Other'], n, p=[0.48, 0.48, 0.04]).astype(object),
+        'Diagnosis': rng.choice(['Cardio', 'Neuro', 'Ortho', 'Respiratory', 'Gastro'], n).astype(object),
+        'Cost': np.round(np.clip(rng.normal(8000, 2500, n), 1000, 25000), 2),
+        'Outcome': rng.choice(['Recovered', 'Readmitted', 'Complication', 'Deceased'], n,
+                              p=[0.75, 0.12, 0.1, 0.03]).astype(object),
+    })
+
+
+def legacy_filter(df, diag_sel, gender_sel, start_date, end_date):
+    df = df.copy()
+    if diag_sel:
+        df = df[df['Diagnosis'].isin(diag_sel)]
+    if gender_sel:
+        df = df[df['Gender'].isin(gender_sel)]
+    df = df[(df['AdmissionDate'] >= pd.to_datetime(start_date)) & (df['AdmissionDate'] <= pd.to_datetime(end_date))]
+    return df['Outcome'].value_counts()
+
+
+def store_filter(store, diag_sel, gender_sel, start_date, end_date):
+    rows = store.select(diag_sel, gender_sel, start_date, end_date)
+    return np.bincount(store.codes['Outcome'][rows], minlength=len(store.categories['Outcome']))
+
+
+def best_of(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    PatientStore = load_app('healthcare').PatientStore
+    query = (['Cardio', 'Neuro'], ['Female'], '2022-06-01', '2023-06-30')
+
+    print("| rows | legacy MB | store MB | ratio | legacy filter ms | store filter ms | speedup |")
+    print("|---:|---:|---:|---:|---:|---:|---:|")
+    for n in args.sizes:
+        df = legacy_frame(n)
+        store = PatientStore.from_frame(df)
+        legacy_mb = df.memory_usage(deep=True).sum() / 1e6
+        store_mb = store.nbytes / 1e6
+        legacy_ms = best_of(legacy_filter, df, *query, repeat=args.repeat)
+        store_ms = best_of(store_filter, store, *query, repeat=args.repeat)
+        print(f"| {n:,} | {legacy_mb:,.1f} | {store_mb:,.1f} | {legacy_mb / store_mb:.1f}x "
+              f"| {legacy_ms:,.2f} | {store_ms:,.2f} | {legacy_ms / store_ms:.1f}x |")
+        del df, store
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Check that Healthcare dashboard figure payloads stay bounded as the cohort grows.
+
+Builds the patient store and filter cube at increasing row counts, renders the
+dashboard figures for every trend granularity, and fails (exit code 1) if the
+serialized JSON grows by more than --max-growth between the smallest and the
+largest dataset.
+
+Usage:
+    python benchmarks/payload_check.py --sizes 5000 50000 500000 --max-growth 1.25
+"""
+import argparse
+import sys
+
+from _apps import load_app
+
+
+def payload_bytes(app, cube, granularity):
+    agg = cube.aggregate((), (), None, None)
+    return sum(len(fig.to_json()) for fig in app.build_figures(agg, False, granularity))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 50_000, 500_000])
+    parser.add_argument('--max-growth', type=float, default=1.25)
+    args = parser.parse_args()
+
+    app = load_app('healthcare')
+    results = {}
+    for n in args.sizes:
+        cube = app.FilterCube(app.PatientStore.from_frame(app.synthetic_patients(n)))
+        results[n] = {g: payload_bytes(app, cube, g) for g in app.TREND_GRANULARITIES}
+
+    print("| rows | " + " | ".join(f"{label} bytes" for label in app.TREND_GRANULARITIES.values()) + " |")
+    print("|---:|" + "---:|" * len(app.TREND_GRANULARITIES))
+    for n, sizes in results.items():
+        print(f"| {n:,} | " + " | ".join(f"{b:,}" for b in sizes.values()) + " |")
+
+    smallest, largest = results[min(results)], results[max(results)]
+    failed = [g for g in smallest if largest[g] > smallest[g] * args.max_growth]
+    if failed:
+        print(f"FAIL: payload grew more than {args.max_growth}x for granularity {', '.join(failed)}")
+        sys.exit(1)
+    print(f"OK: payload growth within {args.max_growth}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Cold-start benchmark for the Digital Skills Pulse data load.
+
+Compares ways of getting the BLS, ITU and O*NET tables into memory:
+  - sequential:  the original import-time load, one source after another,
+                 O*NET TSVs through pandas' C parser;
+  - parallel:    load_datasets() with the snapshot cache off, one thread per
+                 domain and the pyarrow CSV engine;
+  - first-start: parallel, plus hashing sources and writing the snapshots;
+  - snapshot:    a later start, served from those Parquet snapshots.
+
+Usage:
+    python benchmarks/skills_pulse_cold_start.py --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from _apps import load_app
+
+
+def sequential(dsp, datasets):
+    builds = {"bls": dsp.load_bls, "itu": dsp.load_itu, "onet": lambda: dsp.load_onet(engine="c", workers=1)}
+    times = {}
+    for d in datasets:
+        t0 = time.perf_counter()
+        builds[d.name]()
+        times[d.name] = time.perf_counter() - t0
+    return times
+
+
+def parallel(dsp, datasets):
+    fresh = [dsp.Dataset(d.name, d.sources, d.build, d.prepare) for d in datasets]
+    return dsp.load_datasets(fresh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dsp = load_app('skills_pulse')
+    # Derived datasets (no source files) are built from the others, not loaded.
+    sourced = {name: d for name, d in dsp.DATASETS.items() if d.sources is not None}
+    datasets = [d for d in sourced.values() if all(os.path.exists(p) for p in d.sources)]
+    skipped = set(sourced) - {d.name for d in datasets}
+    if skipped:
+        print(f"Skipping domains with missing source files: {', '.join(sorted(skipped))}")
+
+    runs = {'sequential': [], 'parallel': [], 'first-start': [], 'snapshot': []}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            for mode, load in (('sequential', sequential), ('parallel', parallel),
+                               ('first-start', parallel), ('snapshot', parallel)):
+                dsp.SNAPSHOT_DIR = '' if mode == 'parallel' else snapshot_dir
+                t0 = time.perf_counter()
+                per_source = load(dsp, datasets)
+                runs[mode].append((time.perf_counter() - t0, per_source))
+
+    print(f"\n{'mode':<12} {'wall s':>8}  per source (median s)")
+    for mode, results in runs.items():
+        wall = np.median([w for w, _ in results])
+        per_source = ", ".join(
+            f"{d.name} {np.median([p[d.name] for _, p in results]):.2f}" for d in datasets
+        )
+        print(f"{mode:<12} {wall:>8.2f}  {per_source}")
+    base = np.median([w for w, _ in runs['sequential']])
+    for mode in ('parallel', 'first-start', 'snapshot'):
+        print(f"{mode} speedup vs sequential: {base / np.median([w for w, _ in runs[mode]]):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Load test: Flask requests caused by one dark-mode toggle in the Healthcare app.
+
+Walks the app's callback graph from the toggle button to find every callback a
+click triggers, splits them into browser-side and server-side, then replays the
+server-side ones through the Flask test client for many simulated users.
+
+Usage:
+    python benchmarks/theme_toggle_load.py --users 50 --toggles 20
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _apps import load_app
+
+TRIGGER = 'dark-toggle.n_clicks'
+
+
+def _props(spec):
+    """'..a.style...b.style..' / 'a.data' -> ['a.style', 'b.style'] (duplicate hashes dropped)."""
+    parts = spec.strip('.').split('...') if spec.startswith('..') else [spec]
+    return [p.split('@')[0] for p in parts]
+
+
+def triggered_callbacks(app, trigger=TRIGGER):
+    """Callbacks fired, directly or through chained outputs, by a change to `trigger`."""
+    changed, fired = {trigger}, []
+    pending = list(app._callback_list)
+    progress = True
+    while progress:
+        progress = False
+        for cb in list(pending):
+            inputs = {f"{i['id']}.{i['property']}" for i in cb['inputs']}
+            if inputs & changed:
+                fired.append(cb)
+                pending.remove(cb)
+                changed.update(_props(cb['output']))
+                progress = True
+    return fired
+
+
+def _payload(cb, dark):
+    values = {'dark-mode.data': dark, 'dark-toggle.n_clicks': 1}
+    outputs = [dict(zip(('id', 'property'), p.split('.', 1))) for p in cb['output'].strip('.').split('...')]
+    return {
+        'output': cb['output'],
+        'outputs': outputs if cb['output'].startswith('..') else outputs[0],
+        'inputs': [dict(i, value=values.get(f"{i['id']}.{i['property']}")) for i in cb['inputs']],
+        'state': [dict(s, value=values.get(f"{s['id']}.{s['property']}")) for s in cb['state']],
+        'changedPropIds': [f"{i['id']}.{i['property']}" for i in cb['inputs']],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--toggles', type=int, default=20, help='toggles per simulated user')
+    args = parser.parse_args()
+
+    app = load_app('healthcare').app
+    fired = triggered_callbacks(app)
+    server = [cb for cb in fired if not cb.get('clientside_function')]
+    print(f"callbacks fired per toggle:   {len(fired)}")
+    print(f"  handled in the browser:     {len(fired) - len(server)}")
+    print(f"  Flask requests per toggle:  {len(server)}  "
+          f"(would be {len(fired)} with all styling callbacks server-side)")
+
+    client = app.server.test_client()
+    payloads = [json.dumps(_payload(cb, dark)) for dark in (True, False) for cb in server]
+
+    def user(_):
+        sent = 0
+        for t in range(args.toggles):
+            for body in payloads[t % 2 * len(server):(t % 2 + 1) * len(server)]:
+                resp = client.post('/_dash-update-component', data=body, content_type='application/json')
+                assert resp.status_code in (200, 204), resp.data[:200]
+                sent += 1
+        return sent
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        total = sum(pool.map(user, range(args.users)))
+    elapsed = time.perf_counter() - t0
+    toggles = args.users * args.toggles
+    print(f"{toggles:,} toggles from {args.users} users -> {total:,} Flask requests "
+          f"in {elapsed:.2f}s ({total / toggles:.2f} per toggle)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Synthetic patient generator for load-testing the Healthcare dashboard.
+
+Produces the same columns and distributions as the app's built-in 5,000-row
+sample, but at any size: rows are generated in fixed-size chunks across a
+process pool, each chunk seeded from its own `SeedSequence` child, so output
+is reproducible for a given (seed, rows, chunk size) whatever the worker count.
+Rows come out sorted by AdmissionDate, ready for the app to memory-map.
+
+Usage:
+    python generate_synthetic_patients.py --rows 10000000 --out data/patients_10m
+    python generate_synthetic_patients.py --rows 1000000 --format parquet --out data/patients_1m
+
+Then start the app with HEALTHCARE_DATA=<out>.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Labels are sorted so codes line up with PatientStore's dictionary encoding.
+CATEGORIES = {
+    'Gender': ['Female', 'Male', 'Other'],
+    'Diagnosis': ['Cardio', 'Gastro', 'Neuro', 'Ortho', 'Respiratory'],
+    'Outcome': ['Complication', 'Deceased', 'Readmitted', 'Recovered'],
+}
+PROBABILITIES = {
+    'Gender': [0.48, 0.48, 0.04],
+    'Diagnosis': None,
+    'Outcome': [0.10, 0.03, 0.12, 0.75],
+}
+NPY_DTYPES = {'PatientID': np.int32, 'AdmissionDate': 'datetime64[D]', 'Cost': np.float32,
+              'Gender': np.int8, 'Diagnosis': np.int8, 'Outcome': np.int8}
+
+
+def _chunk_columns(lo, hi, seed_seq, first_day, day_ends):
+    """Columns for rows [lo, hi), as codes; dates follow the global day allocation."""
+    rng = np.random.default_rng(seed_seq)
+    n = hi - lo
+    rows = np.arange(lo, hi)
+    columns = {
+        'PatientID': (rows + 1).astype(np.int32),
+        'AdmissionDate': first_day + np.searchsorted(day_ends, rows, 'right').astype('timedelta64[D]'),
+    }
+    for col in ('Gender', 'Diagnosis'):
+        columns[col] = rng.choice(len(CATEGORIES[col]), n, p=PROBABILITIES[col]).astype(np.int8)
+    columns['Cost'] = np.round(np.clip(rng.normal(8000, 2500, n), 1000, 25000), 2)
+    columns['Outcome'] = rng.choice(len(CATEGORIES['Outcome']), n, p=PROBABILITIES['Outcome']).astype(np.int8)
+    return columns
+
+
+def _write_npy_chunk(out, lo, hi, seed_seq, first_day, day_ends):
+    columns = _chunk_columns(lo, hi, seed_seq, first_day, day_ends)
+    for name, values in columns.items():
+        target = np.load(os.path.join(out, f"{name}.npy"), mmap_mode='r+')
+        target[lo:hi] = values
+        target.flush()
+        del target
+    return hi - lo
+
+
+def _write_parquet_chunk(out, index, lo, hi, seed_seq, first_day, day_ends):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    columns = _chunk_columns(lo, hi, seed_seq, first_day, day_ends)
+    arrays = {}
+    for name in ('PatientID', 'AdmissionDate', 'Gender', 'Diagnosis', 'Cost', 'Outcome'):
+        if name in CATEGORIES:
+            arrays[name] = pa.DictionaryArray.from_arrays(columns[name], CATEGORIES[name])
+        elif name == 'AdmissionDate':
+            arrays[name] = pa.array(columns[name].astype('datetime64[ms]'))
+        else:
+            arrays[name] = pa.array(columns[name])
+    pq.write_table(pa.table(arrays), os.path.join(out, f"part-{index:05d}.parquet"))
+    return hi - lo
+
+
+def generate(rows, out, fmt='npy', seed=42, chunk_rows=1_000_000, workers=None,
+             start='2022-01-01', end='2023-12-31'):
+    """Write `rows` synthetic patients to directory `out` as .npy columns or Parquet parts."""
+    root = np.random.SeedSequence(seed)
+    day_seq, *chunk_seqs = root.spawn(1 + -(-rows // chunk_rows))
+    days = pd.date_range(start, end, freq='D')
+    # Admissions per day are drawn once up front; chunks then take contiguous
+    # row ranges, so the output is globally sorted by date.
+    per_day = np.random.default_rng(day_seq).multinomial(rows, np.full(len(days), 1 / len(days)))
+    day_ends = np.cumsum(per_day)
+    first_day = np.datetime64(days[0], 'D')
+
+    os.makedirs(out, exist_ok=True)
+    if fmt == 'npy':
+        for name, dtype in NPY_DTYPES.items():
+            np.lib.format.open_memmap(os.path.join(out, f"{name}.npy"), mode='w+', dtype=dtype, shape=(rows,))
+        with open(os.path.join(out, 'categories.json'), 'w') as f:
+            json.dump(CATEGORIES, f)
+    elif fmt != 'parquet':
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for i, seq in enumerate(chunk_seqs):
+            lo, hi = i * chunk_rows, min(rows, (i + 1) * chunk_rows)
+            if fmt == 'npy':
+                futures.append(pool.submit(_write_npy_chunk, out, lo, hi, seq, first_day, day_ends))
+            else:
+                futures.append(pool.submit(_write_parquet_chunk, out, i, lo, hi, seq, first_day, day_ends))
+        return sum(f.result() for f in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--out', required=True, help='output directory')
+    parser.add_argument('--format', choices=['npy', 'parquet'], default='npy')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--start', default='2022-01-01')
+    parser.add_argument('--end', default='2023-12-31')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    written = generate(args.rows, args.out, args.format, args.seed, args.chunk_rows,
+                       args.workers, args.start, args.end)
+    print(f"Wrote {written:,} rows to {args.out} ({args.format}) in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
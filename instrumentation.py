@@ -0,0 +1,250 @@
+"""
+Opt-in callback instrumentation shared by both Dash apps.
+
+Off by default.  With DASH_INSTRUMENT=1 every @app.callback is timed, and
+callbacks mark their own stages (filter, figure build, ...) with:
+
+    with stage("filter") as s:
+        df = ...
+        s.rows = len(df)
+
+Timings and row counts are exposed as:
+  - Prometheus text metrics on /metrics (per app, callback and stage;
+    counters are per process, so scrape every worker);
+  - a Server-Timing header on each response, visible in the browser's
+    network panel.  The "serialize" stage is the request time spent outside
+    the callback, mostly Dash encoding the outputs as JSON.
+
+With DASH_PROFILE_SLOW_MS=<ms> callbacks are also profiled, and profiles of
+calls slower than the threshold are written to DASH_PROFILE_DIR (default
+profiles/): pyinstrument HTML if it is installed, cProfile .prof otherwise.
+
+Usage:
+    DASH_INSTRUMENT=1 DASH_PROFILE_SLOW_MS=500 python "Digital Skills Pulse.py"
+"""
+import cProfile
+import functools
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+ENABLED = os.environ.get("DASH_INSTRUMENT", "").lower() in ("1", "true", "yes")
+PROFILE_SLOW_MS = float(os.environ.get("DASH_PROFILE_SLOW_MS") or 0)
+PROFILE_DIR = os.environ.get("DASH_PROFILE_DIR", "profiles")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DASH_UPDATE_PATH = "_dash-update-component"
+
+log = logging.getLogger(__name__)
+_local = threading.local()
+# One profiler at a time: cProfile refuses to run concurrently in one process.
+_profile_lock = threading.Lock()
+
+
+def _labels(app, callback, stage):
+    def quote(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"')
+    return f'app="{quote(app)}",callback="{quote(callback)}",stage="{quote(stage)}"'
+
+
+class Metrics:
+    """Thread-safe latency histograms and row counters keyed by (app, callback, stage)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = {}
+        self._rows = {}
+
+    def observe(self, key, seconds, rows=None):
+        with self._lock:
+            hist = self._seconds.get(key)
+            if hist is None:
+                # Bucket counts, then total count and sum.
+                hist = self._seconds[key] = [0] * len(BUCKETS) + [0, 0.0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += 1
+            hist[-1] += seconds
+            if rows is not None:
+                self._rows[key] = self._rows.get(key, 0) + int(rows)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP dash_stage_seconds Time spent per Dash callback stage.",
+            "# TYPE dash_stage_seconds histogram",
+        ]
+        with self._lock:
+            for key, hist in sorted(self._seconds.items()):
+                labels = _labels(*key)
+                for bound, count in zip(BUCKETS, hist):
+                    lines.append(f'dash_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'dash_stage_seconds_bucket{{{labels},le="+Inf"}} {hist[-2]}')
+                lines.append(f"dash_stage_seconds_sum{{{labels}}} {hist[-1]:.6f}")
+                lines.append(f"dash_stage_seconds_count{{{labels}}} {hist[-2]}")
+            lines += [
+                "# HELP dash_stage_rows_total Rows processed per Dash callback stage.",
+                "# TYPE dash_stage_rows_total counter",
+            ]
+            for key, rows in sorted(self._rows.items()):
+                lines.append(f"dash_stage_rows_total{{{_labels(*key)}}} {rows}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _current():
+    """(app, callback) the running code belongs to."""
+    current = getattr(_local, "current", None)
+    if current:
+        return current
+    if has_request_context():
+        return g.get("instrumented_app", "-"), request.endpoint or "-"
+    return "-", "-"
+
+
+def _record(stage_name, seconds, rows=None):
+    app_name, callback = _current()
+    metrics.observe((app_name, callback, stage_name), seconds, rows)
+    if has_request_context():
+        g.setdefault("server_timing", []).append((f"{callback}.{stage_name}", seconds))
+
+
+class _Stage:
+    __slots__ = ("rows",)
+
+    def __init__(self, rows=None):
+        self.rows = rows
+
+
+class stage:
+    """Time a block as one stage of the current callback; a no-op unless ENABLED."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.record = _Stage(rows)
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        if ENABLED:
+            _record(self.name, time.perf_counter() - self.t0, self.record.rows)
+        return False
+
+
+def _start_profiler():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = Profiler()
+        profiler.start()
+    return profiler
+
+
+def _stop_profiler(profiler, name, elapsed_ms):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+    if elapsed_ms < PROFILE_SLOW_MS:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    if isinstance(profiler, cProfile.Profile):
+        path = stem + ".prof"
+        profiler.dump_stats(path)
+    else:
+        path = stem + ".html"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+    log.warning("Slow callback %s took %.0f ms; profile written to %s", name, elapsed_ms, path)
+
+
+def _call_profiled(name, func, args, kwargs):
+    if not _profile_lock.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        try:
+            profiler = _start_profiler()
+        except ValueError:
+            # Another profiler is already active (e.g. the app runs under one).
+            return func(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _stop_profiler(profiler, name, (time.perf_counter() - t0) * 1000)
+    finally:
+        _profile_lock.release()
+
+
+def _timed(app_name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "current", None)
+        _local.current = (app_name, func.__name__)
+        if has_request_context():
+            g.dash_callback = func.__name__
+        t0 = time.perf_counter()
+        try:
+            if PROFILE_SLOW_MS:
+                return _call_profiled(func.__name__, func, args, kwargs)
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - t0
+            _record("total", seconds)
+            if has_request_context():
+                g.callback_seconds = g.get("callback_seconds", 0.0) + seconds
+            _local.current = previous
+    return wrapper
+
+
+def instrument(app, name):
+    """Time every callback registered on `app` from now on; a no-op unless ENABLED.
+
+    Call it right after creating the app, before any @app.callback.
+    """
+    if not ENABLED:
+        return app
+    register = app.callback
+
+    @functools.wraps(register)
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+        return lambda func: decorator(_timed(name, func))
+
+    app.callback = callback
+    server = app.server
+
+    @server.before_request
+    def _start_request_timer():
+        g.instrumented_app = name
+        g.request_start = time.perf_counter()
+
+    @server.after_request
+    def _add_server_timing(response):
+        if request.path.endswith(DASH_UPDATE_PATH) and "callback_seconds" in g:
+            outside = time.perf_counter() - g.request_start - g.callback_seconds
+            metrics.observe((name, g.get("dash_callback", "-"), "serialize"), max(outside, 0.0))
+            g.setdefault("server_timing", []).append((f"{g.get('dash_callback', '-')}.serialize", outside))
+        timings = g.get("server_timing")
+        if timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{label};dur={seconds * 1000:.1f}" for label, seconds in timings
+            )
+        return response
+
+    @server.route("/metrics")
+    def _metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    return app